@@ -9,20 +9,158 @@ from discord.ui import Modal, TextInput
 from discord import TextStyle
 import typing
 from typing import Dict, Optional
+import os
 import random
 from discord.ui import View, Button
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import aiosqlite
 import time
-import secrets
 import math
+import weakref
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
 
 from redbot.core import commands, Config, checks, app_commands
 from redbot.core.bot import Red
 
 log = logging.getLogger("red.DurkCogs.SS14Currency")
 
+AUTH_API_URL = "https://auth.spacestation14.com/api/query"
+# Rate-limited or briefly unavailable auth API responses are retried with exponential backoff
+AUTH_API_RETRY_STATUSES = frozenset({429, 503})
+AUTH_API_MAX_ATTEMPTS = 3
+AUTH_API_MAX_RETRY_DELAY = 10.0
+
+# SS14 database pool size. Pools are shared by every guild using the same connection
+# string, so this is fixed for the bot rather than configured per guild.
+DB_POOL_MIN_SIZE = 5  # Connections kept open to the SS14 database
+DB_POOL_MAX_SIZE = 25  # Upper bound on concurrent SS14 database connections
+
+# OS-backed RNG for coinflips, created once and shared by every flip
+_coinflip_rng = random.SystemRandom()
+
+# Leaderboard medals for the top three places
+_MEDALS = ("🥇", "🥈", "🥉")
+
+# Economy health score tiers, highest first: (minimum score, status, color factory, description)
+_HEALTH_TIERS = (
+    (85, "🟢 Excellent", discord.Color.green, "Thriving economy with high participation and activity"),
+    (70, "🟢 Good", discord.Color.green, "Healthy economy with solid fundamentals"),
+    (55, "🟡 Fair", discord.Color.gold, "Moderate economy with room for growth"),
+    (40, "🟠 Needs Improvement", discord.Color.orange, "Struggling economy requiring attention"),
+    (0, "🔴 Poor", discord.Color.red, "Weak economy needing significant intervention"),
+)
+
+# Distribution points by inequality: (inequality below, points); lower inequality scores higher
+_INEQUALITY_TIERS = ((25, 20), (50, 18), (75, 15), (100, 12), (150, 8), (math.inf, 5))
+
+# Diversity points indexed by the number of active transaction types
+_DIVERSITY_SCORES = (0, 3, 7, 10)
+
+# History labels for every transaction type except transfers, whose label depends on direction
+_HISTORY_DIRECTIONS = {
+    "gambling": "🎲 Gambling",
+    "admin_set": "⚙️ Balance Set",
+    "admin_add": "⚙️ Admin Adjusted",
+    "market_bet": "📈 Market Bet",
+    "market_win": "💰 Market Win",
+}
+
+def discord_timestamp(timestamp: typing.Union[str, datetime], style: str = "f") -> str:
+    """Formats a SQLite CURRENT_TIMESTAMP value (UTC) as a Discord timestamp tag."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return f"<t:{int(timestamp.timestamp())}:{style}>"
+
+def balance_change(old: int, new: int) -> str:
+    """Formats a before/after balance pair the way every result embed shows it."""
+    return f"`{old:,}` ➜ `{new:,}`"
+
+def sqlite_cutoff(hours: float) -> str:
+    """Returns the UTC time `hours` ago in SQLite's CURRENT_TIMESTAMP format, for index-friendly range filters."""
+    return (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+
+# Hot local INSERTs are kept as single constants so every call reuses sqlite3's cached statement
+TRANSACTION_HISTORY_INSERT = """
+    INSERT INTO transaction_history
+    (guild_id, transaction_type, from_player_id, to_player_id, amount, balance_before, balance_after, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+TAX_REVENUE_INSERT = "INSERT INTO tax_revenue (guild_id, tax_type, amount) VALUES (?, ?, ?)"
+
+GAMBLING_STATS_UPSERT = """
+    INSERT INTO gambling_stats (
+        guild_id, player_id, game_type, total_games, total_wins, total_losses,
+        total_wagered, total_won, total_lost, biggest_win, biggest_loss
+    ) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, player_id, game_type) DO UPDATE SET
+        total_games = total_games + 1,
+        total_wins = total_wins + excluded.total_wins,
+        total_losses = total_losses + excluded.total_losses,
+        total_wagered = total_wagered + excluded.total_wagered,
+        total_won = total_won + excluded.total_won,
+        total_lost = total_lost + excluded.total_lost,
+        biggest_win = MAX(biggest_win, excluded.biggest_win),
+        biggest_loss = MAX(biggest_loss, excluded.biggest_loss),
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Leaderboards served from the local DB. The gambling boards read the trigger-maintained
+# gambling_summary through its (guild_id, games) / (guild_id, net) indexes and yield
+# (player_id, games, net); the activity board yields (player_id, tx_count, total_volume).
+LOCAL_LEADERBOARD_QUERIES = {
+    "games": "SELECT player_id, games, net FROM gambling_summary WHERE guild_id = ? ORDER BY games DESC LIMIT 10",
+    "profit": "SELECT player_id, games, net FROM gambling_summary WHERE guild_id = ? AND net > 0 ORDER BY net DESC LIMIT 10",
+    "losses": "SELECT player_id, games, net FROM gambling_summary WHERE guild_id = ? AND net < 0 ORDER BY net ASC LIMIT 10",
+    "activity": """
+        SELECT COALESCE(from_player_id, to_player_id) as player_id, COUNT(*) as tx_count, SUM(amount) as total_volume
+        FROM transaction_history
+        WHERE guild_id = ? AND transaction_type = 'transfer'
+        GROUP BY player_id
+        ORDER BY tx_count DESC
+        LIMIT 10
+    """,
+}
+
+def gambling_stats_row(guild_id: int, player_id: uuid.UUID, game_type: str, wagered: int, won: bool, winnings: int) -> tuple:
+    """Builds the GAMBLING_STATS_UPSERT parameters for one game result. winnings is the net gain/loss."""
+    return (
+        guild_id, str(player_id), game_type,
+        1 if won else 0,  # wins
+        0 if won else 1,  # losses
+        wagered,
+        max(0, winnings),  # total_won
+        max(0, -winnings), # total_lost
+        max(0, winnings),  # biggest_win
+        max(0, -winnings)  # biggest_loss
+    )
+
+def transaction_row(
+    guild_id: int,
+    transaction_type: str,
+    amount: int,
+    from_player_id: Optional[uuid.UUID] = None,
+    to_player_id: Optional[uuid.UUID] = None,
+    balance_before: Optional[int] = None,
+    balance_after: Optional[int] = None,
+    notes: Optional[str] = None
+) -> tuple:
+    """Builds one TRANSACTION_HISTORY_INSERT parameter row."""
+    return (
+        guild_id,
+        transaction_type,
+        str(from_player_id) if from_player_id else None,
+        str(to_player_id) if to_player_id else None,
+        amount,
+        balance_before,
+        balance_after,
+        notes
+    )
+
 async def get_player_currency(pool: asyncpg.Pool, player_id: uuid.UUID) -> Optional[int]:
     """Gets the currency for a given player ID."""
     async with pool.acquire() as conn:
@@ -37,13 +175,16 @@ async def set_player_currency(pool: asyncpg.Pool, player_id: uuid.UUID, amount:
     
     try:
         async with pool.acquire() as conn:
-            # Get old balance
-            old_balance = await conn.fetchval("SELECT server_currency FROM player WHERE user_id = $1;", player_id)
+            # Lock the row and return its previous balance in the same statement
+            query = """
+                UPDATE player p SET server_currency = $1
+                FROM (SELECT user_id, server_currency FROM player WHERE user_id = $2 FOR UPDATE) old
+                WHERE p.user_id = old.user_id
+                RETURNING old.server_currency;
+            """
+            old_balance = await conn.fetchval(query, amount, player_id)
             if old_balance is None:
                 return False, None
-            
-            query = "UPDATE player SET server_currency = $1 WHERE user_id = $2;"
-            await conn.execute(query, amount, player_id)
             return True, old_balance
     except Exception as e:
         log.error(f"Error setting currency for player {player_id}: {e}", exc_info=True)
@@ -53,29 +194,44 @@ async def add_player_currency(pool: asyncpg.Pool, player_id: uuid.UUID, amount:
     """Adds an amount of currency to a given player ID. Returns (success, old_balance, new_balance). Prevents negative balances."""
     try:
         async with pool.acquire() as conn:
-            async with conn.transaction():
-                # Get current balance with row lock
-                old_balance = await conn.fetchval(
-                    "SELECT server_currency FROM player WHERE user_id = $1 FOR UPDATE;",
-                    player_id
-                )
-                if old_balance is None:
-                    return False, None, None
-                
-                new_balance = old_balance + amount
-                
-                # Negative balance protection
-                if new_balance < 0:
-                    log.warning(f"Transaction would result in negative balance for {player_id}: {old_balance} + {amount} = {new_balance}")
-                    return False, old_balance, None
-                
-                query = "UPDATE player SET server_currency = $1 WHERE user_id = $2;"
-                await conn.execute(query, new_balance, player_id)
-                return True, old_balance, new_balance
+            # Single atomic statement; the guard replaces the SELECT ... FOR UPDATE check
+            query = """
+                UPDATE player SET server_currency = server_currency + $1
+                WHERE user_id = $2 AND server_currency + $1 >= 0
+                RETURNING server_currency - $1 AS old_balance, server_currency AS new_balance;
+            """
+            row = await conn.fetchrow(query, amount, player_id)
+            if row is not None:
+                return True, row["old_balance"], row["new_balance"]
+            
+            # Nothing updated: either the player doesn't exist or the balance would go negative
+            old_balance = await conn.fetchval("SELECT server_currency FROM player WHERE user_id = $1;", player_id)
+            if old_balance is None:
+                return False, None, None
+            log.warning(f"Transaction would result in negative balance for {player_id}: {old_balance} + {amount} = {old_balance + amount}")
+            return False, old_balance, None
     except Exception as e:
         log.error(f"Error adding currency for player {player_id}: {e}", exc_info=True)
         return False, None, None
 
+async def add_player_currencies(pool: asyncpg.Pool, amounts: Dict[uuid.UUID, int]) -> Dict[uuid.UUID, tuple[int, int]]:
+    """Adds currency to many players in one UPDATE. Returns {player_id: (old_balance, new_balance)} for the players that were credited.
+
+    Players that don't exist or would go negative are left out of the result, same as a failed add_player_currency.
+    Database errors are raised: the UPDATE is atomic, so on error nobody was credited and the caller can safely retry.
+    """
+    if not amounts:
+        return {}
+    async with pool.acquire() as conn:
+        query = """
+            UPDATE player AS p SET server_currency = p.server_currency + c.amount
+            FROM unnest($1::uuid[], $2::bigint[]) AS c(user_id, amount)
+            WHERE p.user_id = c.user_id AND p.server_currency + c.amount >= 0
+            RETURNING p.user_id, p.server_currency - c.amount AS old_balance, p.server_currency AS new_balance;
+        """
+        rows = await conn.fetch(query, list(amounts), list(amounts.values()))
+        return {row["user_id"]: (row["old_balance"], row["new_balance"]) for row in rows}
+
 async def get_leaderboard(pool: asyncpg.Pool) -> list:
     """Gets the top 10 players by currency."""
     async with pool.acquire() as conn:
@@ -88,58 +244,149 @@ async def get_leaderboardasc(pool: asyncpg.Pool) -> list:
         query = "SELECT last_seen_user_name, server_currency FROM player WHERE server_currency != 0 ORDER BY server_currency ASC LIMIT 10;"
         return await conn.fetch(query)
 
-async def get_player_id_from_discord(pool: asyncpg.Pool, discord_id: int) -> Optional[uuid.UUID]:
-    """Gets the player's user_id from their discord ID."""
+async def get_player_id_from_discord(pool: asyncpg.Pool, discord_id: int) -> tuple[Optional[uuid.UUID], Optional[str]]:
+    """Gets the player's user_id from their discord ID, along with their last seen username."""
+    async with pool.acquire() as conn:
+        query = """
+            SELECT l.player_id, p.last_seen_user_name
+            FROM rmc_linked_accounts l
+            LEFT JOIN player p ON p.user_id = l.player_id
+            WHERE l.discord_id = $1;
+        """
+        row = await conn.fetchrow(query, discord_id)
+    if row is None:
+        return None, None
+    return row["player_id"], row["last_seen_user_name"]
+
+async def query_auth_api(session: aiohttp.ClientSession, endpoint: str, params: Dict[str, str]) -> Optional[dict]:
+    """
+    GETs an SS14 auth API query endpoint and returns the decoded JSON body, or None on failure.
+
+    429/503 responses are retried up to AUTH_API_MAX_ATTEMPTS times, sleeping for the
+    server's Retry-After when given and 2**attempt seconds plus jitter otherwise.
+    """
+    for attempt in range(AUTH_API_MAX_ATTEMPTS):
+        async with session.get(f"{AUTH_API_URL}/{endpoint}", params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            if response.status not in AUTH_API_RETRY_STATUSES or attempt == AUTH_API_MAX_ATTEMPTS - 1:
+                log.warning(f"API query {endpoint} for {params} failed with status {response.status}")
+                return None
+            retry_after = response.headers.get("Retry-After")
+
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = 2 ** attempt + random.random()
+        await asyncio.sleep(min(delay, AUTH_API_MAX_RETRY_DELAY))
+    return None
+
+async def get_last_seen_names(pool: asyncpg.Pool, player_ids: typing.List[str]) -> Dict[str, str]:
+    """Gets last_seen_user_name for many players in one query, keyed by player ID string. Players without a name are omitted."""
     async with pool.acquire() as conn:
-        query = "SELECT player_id FROM rmc_linked_accounts WHERE discord_id = $1;"
-        return await conn.fetchval(query, discord_id)
+        query = "SELECT user_id, last_seen_user_name FROM player WHERE user_id = ANY($1::uuid[]);"
+        rows = await conn.fetch(query, player_ids)
+    return {str(row["user_id"]): row["last_seen_user_name"] for row in rows if row["last_seen_user_name"]}
 
-async def get_user_name_from_id(session: aiohttp.ClientSession, user_id: uuid.UUID) -> Optional[str]:
+async def get_user_name_from_id(session: aiohttp.ClientSession, user_id: typing.Union[uuid.UUID, str]) -> Optional[str]:
     """Queries the SS14 auth API for a user's username by their UUID."""
-    url = f"https://auth.spacestation14.com/api/query/userid?userid={user_id}"
     try:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                return data.get("userName")
-            else:
-                log.warning(f"API query for {user_id} failed with status {response.status}")
-                return None
-    except aiohttp.ClientError as e:
+        data = await query_auth_api(session, "userid", {"userid": str(user_id)})
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         log.error(f"Error querying auth API for {user_id}: {e}", exc_info=True)
         return None
-
-async def transfer_currency(pool: asyncpg.Pool, from_player_id: uuid.UUID, to_player_id: uuid.UUID, amount: int) -> Optional[Dict[str, int]]:
-    """Atomically transfers currency from one player to another and returns their old and new balances."""
+    return data.get("userName") if data else None
+
+async def transfer_currency(
+    pool: asyncpg.Pool,
+    from_player_id: uuid.UUID,
+    to_player_id: uuid.UUID,
+    amount: int,
+    credit: Optional[int] = None
+) -> Optional[Dict[str, int]]:
+    """
+    Atomically moves currency between players in a single statement and returns their old and new balances.
+
+    The sender is debited amount and the recipient credited credit (defaults to amount, lower
+    when the house takes a cut). Returns None if the sender cannot cover it, either account is missing,
+    or sender and recipient are the same player.
+    """
+    if credit is None:
+        credit = amount
+    query = """
+        WITH debit AS (
+            UPDATE player SET server_currency = server_currency - $3
+            WHERE user_id = $1 AND server_currency >= $3
+              -- Both CTEs would hit the same row for a self-transfer, and Postgres would
+              -- then drop the credit; refuse it so the debit never commits alone
+              AND $1 <> $2
+              AND EXISTS (SELECT 1 FROM player WHERE user_id = $2)
+            RETURNING server_currency
+        ), credit AS (
+            UPDATE player SET server_currency = server_currency + $4
+            WHERE user_id = $2 AND EXISTS (SELECT 1 FROM debit)
+            RETURNING server_currency
+        )
+        SELECT debit.server_currency AS sender_new, credit.server_currency AS recipient_new
+        FROM debit, credit;
+    """
     try:
         async with pool.acquire() as conn:
-            async with conn.transaction():
-                sender_balance = await conn.fetchval("SELECT server_currency FROM player WHERE user_id = $1 FOR UPDATE;", from_player_id)
-                if sender_balance is None or sender_balance < amount:
-                    return None
-
-                recipient_balance = await conn.fetchval("SELECT server_currency FROM player WHERE user_id = $1 FOR UPDATE;", to_player_id)
-                if recipient_balance is None:
-                    return None
-
-                await conn.execute("UPDATE player SET server_currency = server_currency - $1 WHERE user_id = $2;", amount, from_player_id)
-                await conn.execute("UPDATE player SET server_currency = server_currency + $1 WHERE user_id = $2;", amount, to_player_id)
-
-                return {
-                    "sender_old": sender_balance,
-                    "sender_new": sender_balance - amount,
-                    "recipient_old": recipient_balance,
-                    "recipient_new": recipient_balance + amount
-                }
+            row = await conn.fetchrow(query, from_player_id, to_player_id, amount, credit)
     except Exception as e:
         log.error(f"Error during currency transfer from {from_player_id} to {to_player_id}: {e}", exc_info=True)
         return None
+    if row is None:
+        return None
+    return {
+        "sender_old": row["sender_new"] + amount,
+        "sender_new": row["sender_new"],
+        "recipient_old": row["recipient_new"] - credit,
+        "recipient_new": row["recipient_new"]
+    }
+
+class TTLCache:
+    """A small LRU cache whose entries expire a fixed number of seconds after being set."""
+    def __init__(self, ttl: float, maxsize: int = 4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[typing.Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: typing.Hashable, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: typing.Hashable, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: typing.Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+@dataclass
+class PoolEntry:
+    """An SS14 database pool shared by every guild using one DSN, and the lock guarding its lifecycle."""
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pool: Optional[asyncpg.Pool] = None
 
 @dataclass
 class PlayerInfo:
     """Information about a resolved player."""
     player_id: uuid.UUID
-    player_name: str
+    player_name: Optional[str]
     discord_name: Optional[str] = None
 
 
@@ -199,6 +446,7 @@ class DbConfigModal(Modal, title="Database Configuration"):
         connection_string = f"postgresql://{username}:{encoded_password}@{host}:{port}/{dbname}"
 
         await self.cog.config.guild_from_id(self.guild_id).db_connection_string.set(connection_string)
+        self.cog.guild_settings_cache.pop(self.guild_id, None)
 
         await self.cog.close_guild_pool(self.guild_id)
         pool = await self.cog.get_pool_for_guild(self.guild_id)
@@ -538,10 +786,11 @@ class BlackjackView(View):
         if payout > 0:
             await add_player_currency(self.pool, self.game.player_id, payout)
         
-        # Record tax on house winnings
+        # Record tax on house winnings; the commit runs while the result is fetched and shown
+        tax_task = None
         if net_change < 0:
             tax = abs(net_change)
-            await self.cog.record_tax(self.guild_id, "blackjack", tax)
+            tax_task = asyncio.create_task(self.cog.record_tax(self.guild_id, "blackjack", tax))
         
         # Create result embed
         embed = self.game.get_display_embed(reveal_dealer=True)
@@ -580,6 +829,8 @@ class BlackjackView(View):
         embed.add_field(name="💰 New Balance", value=f"{new_balance:,} coins", inline=True)
         
         await self.message.edit(embed=embed, view=self)
+        if tax_task is not None:
+            await tax_task
         
         # Record gambling stats
         won = net_change > 0
@@ -601,13 +852,20 @@ class BlackjackView(View):
 class SS14Currency(commands.Cog):
     """Cog for managing SS14 server currency."""
     async def close_guild_pool(self, guild_id: int):
-        if guild_id in self.guild_pools:
-            pool = self.guild_pools.pop(guild_id)
-            if pool:
-                await pool.close()
-                log.info(f"Closed database connection pool for Guild {guild_id}.")
-        if guild_id in self.pool_locks:
-            del self.pool_locks[guild_id]
+        """Detaches a guild from its pool, closing the pool once no other guild shares its DSN."""
+        self.guild_pools.pop(guild_id, None)
+        conn_string = self.guild_dsn.pop(guild_id, None)
+        entry = self.pool_entries.get(conn_string) if conn_string is not None else None
+        if entry is not None:
+            async with entry.lock:
+                # Another guild may have attached, or the entry been retired, while we waited
+                if conn_string not in self.guild_dsn.values() and self.pool_entries.get(conn_string) is entry:
+                    del self.pool_entries[conn_string]
+                    if entry.pool:
+                        await entry.pool.close()
+                        log.info(f"Closed database connection pool for Guild {guild_id}.")
+        # Links may differ in the newly configured database
+        self.player_id_cache.clear()
 
 
     DEFAULT_GUILD = {
@@ -618,55 +876,190 @@ class SS14Currency(commands.Cog):
         "large_transaction_threshold": 1000,  # Amount requiring confirmation
     }
 
+    # Seconds a cached Discord -> player ID link stays valid
+    LOOKUP_CACHE_TTL = 300
+    # Seconds dashboard aggregates (volume, tax, gambling boards) are reused before being recomputed
+    STATS_CACHE_TTL = 30
+    # The wealth snapshot scans and sorts the game DB's whole player table, and balances also
+    # change in-game where the bot cannot see them, so it is refreshed on a slower timer
+    WEALTH_CACHE_TTL = 300
+
+    # SS14 usernames change rarely, so auth API lookups are kept for an hour
+    NAME_CACHE_TTL = 3600
+    NAME_CACHE_SIZE = 10_000
+
+    # Number of tracked users at which idle rate limit entries are swept
+    RATE_LIMIT_SWEEP_SIZE = 1024
+
+    # Read-only local SQLite connections opened next to the writer
+    LOCAL_READER_COUNT = min(4, os.cpu_count() or 1)
+    # Prepared statements kept per local connection (sqlite3 defaults to 128)
+    LOCAL_STATEMENT_CACHE_SIZE = 256
+
+    # Market ID draws before create_market gives up on collisions
+    MARKET_ID_ATTEMPTS = 3
+
+    # Transaction log batching: max rows per commit and seconds to wait for more rows
+    LOG_BATCH_SIZE = 100
+    LOG_BATCH_WINDOW = 0.05
+
     def __init__(self, bot: Red):
         self.bot = bot
         self.config = Config.get_conf(self, identifier="SS14CurrencyMultiDB", force_registration=True)
         self.config.register_guild(**self.DEFAULT_GUILD)
+        # Guilds pointing at the same database share one pool; guild_dsn doubles as its refcount
         self.guild_pools: Dict[int, asyncpg.Pool] = {}
-        self.pool_locks: Dict[int, asyncio.Lock] = {}
-        self.session = aiohttp.ClientSession()
+        self.guild_dsn: Dict[int, str] = {}
+        self.pool_entries: Dict[str, PoolEntry] = {}
+        # Guild config snapshots; entries are dropped whenever a setting is changed
+        self.guild_settings_cache: Dict[int, dict] = {}
+        self.transfer_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Created in cog_load, where the bot's event loop is guaranteed to be running
+        self.session: Optional[aiohttp.ClientSession] = None
         
         # Local SQLite database for bot-specific data
         self.local_db_path = Path(__file__).parent / "gambling_stats.db"
         self.local_db: Optional[aiosqlite.Connection] = None
+        # Read-only connections so report queries do not queue behind writes or each other
+        self.local_readers: typing.List[aiosqlite.Connection] = []
+        self.local_reader_turn = 0
+        
+        # Caches for Discord -> player ID links and SS14 auth API lookups in both directions
+        self.player_id_cache = TTLCache(ttl=self.LOOKUP_CACHE_TTL)
+        self.user_name_cache = TTLCache(ttl=self.NAME_CACHE_TTL, maxsize=self.NAME_CACHE_SIZE)
+        self.user_id_cache = TTLCache(ttl=self.NAME_CACHE_TTL, maxsize=self.NAME_CACHE_SIZE)
+        self.stats_cache = TTLCache(ttl=self.STATS_CACHE_TTL)
+        self.wealth_cache = TTLCache(ttl=self.WEALTH_CACHE_TTL)
+        self.user_name_lookups: Dict[str, asyncio.Future] = {}
+        
+        # Transaction log rows waiting to be written by the background worker
+        self.log_queue: asyncio.Queue = asyncio.Queue()
+        self.log_task: Optional[asyncio.Task] = None
         
         # Rate limiting and cooldown tracking
-        self.transfer_timestamps: Dict[int, list] = {}  # user_id -> list of timestamps
+        # (guild_id, user_id) -> timestamps in the current window, oldest first; each guild has its own limit
+        self.transfer_timestamps: Dict[tuple, deque] = {}
         self.gambling_cooldowns: Dict[int, float] = {}  # user_id -> timestamp
 
-    async def get_pool_for_guild(self, guild_id: int) -> Optional[asyncpg.Pool]:
-        if guild_id in self.guild_pools:
-            return self.guild_pools[guild_id]
+    async def cog_load(self):
+        # Keep-alive connections to the SS14 auth API are reused across lookups
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, limit_per_host=16, ttl_dns_cache=300, keepalive_timeout=75),
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+        # Open the local database up front so commands never pay for (or race on) its setup
+        await self.initialize_local_db()
+        self.log_task = asyncio.create_task(self.transaction_log_worker())
+
+    async def get_guild_settings(self, guild_id: int) -> dict:
+        """Returns the guild's config values, reading Config only on the first call after a change."""
+        settings = self.guild_settings_cache.get(guild_id)
+        if settings is None:
+            settings = await self.config.guild_from_id(guild_id).all()
+            self.guild_settings_cache[guild_id] = settings
+        return settings
 
-        if guild_id not in self.pool_locks:
-            self.pool_locks[guild_id] = asyncio.Lock()
+    async def get_pool_for_guild(self, guild_id: int) -> Optional[asyncpg.Pool]:
+        # Fast path: a live cached pool is returned without touching the lock
+        pool = self.guild_pools.get(guild_id)
+        if pool is not None and not pool.is_closing():
+            return pool
+
+        settings = await self.get_guild_settings(guild_id)
+        conn_string = settings["db_connection_string"]
+        if not conn_string:
+            log.warning(f"Database connection string not set for Guild {guild_id}.")
+            return None
 
-        async with self.pool_locks[guild_id]:
-            if guild_id in self.guild_pools:
-                return self.guild_pools[guild_id]
+        while True:
+            entry = self.pool_entries.setdefault(conn_string, PoolEntry())
+            async with entry.lock:
+                # close_guild_pool may have retired this entry while we waited; start over on a fresh one
+                if self.pool_entries.get(conn_string) is not entry:
+                    continue
 
-            conn_string = await self.config.guild_from_id(guild_id).db_connection_string()
-            if not conn_string:
-                log.warning(f"Database connection string not set for Guild {guild_id}.")
-                return None
+                pool = entry.pool
+                if pool is None or pool.is_closing():
+                    try:
+                        # Every helper uses $n parameters, so each connection's statement cache
+                        # lets repeat calls skip parse/plan and send only Bind+Execute.
+                        # Idle connections are recycled after 5 minutes so dead backends get reaped.
+                        # create_pool opens min_size connections up front, so bad credentials or an
+                        # unreachable host already fail here without a separate test query.
+                        pool = await asyncpg.create_pool(
+                            conn_string,
+                            min_size=DB_POOL_MIN_SIZE,
+                            max_size=DB_POOL_MAX_SIZE,
+                            max_inactive_connection_lifetime=300,
+                            command_timeout=10,
+                            statement_cache_size=1024,
+                        )
+                        log.info(
+                            f"Database connection pool established for Guild {guild_id} "
+                            f"(min_size={DB_POOL_MIN_SIZE}, max_size={DB_POOL_MAX_SIZE})."
+                        )
+                    except (asyncpg.PostgresError, OSError) as e:
+                        log.error(f"Failed to establish database connection pool for Guild {guild_id}: {e}", exc_info=True)
+                        return None
+                    entry.pool = pool
 
-            try:
-                pool = await asyncpg.create_pool(conn_string, min_size=2, max_size=10)
-                async with pool.acquire() as conn:
-                    await conn.execute("SELECT 1;")
-                log.info(f"Database connection pool established for Guild {guild_id}.")
                 self.guild_pools[guild_id] = pool
+                self.guild_dsn[guild_id] = conn_string
                 return pool
-            except (asyncpg.PostgresError, OSError) as e:
-                log.error(f"Failed to establish database connection pool for Guild {guild_id}: {e}", exc_info=True)
-                return None
+
+    async def get_player_id(self, pool: asyncpg.Pool, discord_id: int) -> Optional[uuid.UUID]:
+        """
+        Cached wrapper around get_player_id_from_discord. Unlinked users are not cached.
+
+        The player's last seen username comes back with the link and seeds the name cache,
+        so resolving a linked member usually needs no auth API request.
+        """
+        key = (pool, discord_id)
+        player_id = self.player_id_cache.get(key)
+        if player_id is None:
+            player_id, last_seen_name = await get_player_id_from_discord(pool, discord_id)
+            if player_id is not None:
+                self.player_id_cache.set(key, player_id)
+                if last_seen_name and self.user_name_cache.get(str(player_id)) is None:
+                    self.user_name_cache.set(str(player_id), last_seen_name)
+        return player_id
+
+    async def get_user_name(self, player_id: typing.Union[uuid.UUID, str]) -> Optional[str]:
+        """
+        Cached wrapper around get_user_name_from_id. Failed lookups are not cached.
+
+        Concurrent misses for the same player share one in-flight auth API request.
+        """
+        key = str(player_id)
+        name = self.user_name_cache.get(key)
+        if name is not None:
+            return name
+        lookup = self.user_name_lookups.get(key)
+        if lookup is None:
+            lookup = asyncio.ensure_future(get_user_name_from_id(self.session, player_id))
+            self.user_name_lookups[key] = lookup
+            lookup.add_done_callback(lambda _: self.user_name_lookups.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the lookup for the others
+        name = await asyncio.shield(lookup)
+        if name is not None:
+            self.user_name_cache.set(key, name)
+            self.user_id_cache.set(name, uuid.UUID(key))
+        return name
 
     async def initialize_local_db(self):
         """Initialize the local SQLite database for gambling stats and transaction history."""
         if self.local_db is not None:
             return
             
-        self.local_db = await aiosqlite.connect(self.local_db_path)
+        self.local_db = await aiosqlite.connect(self.local_db_path, cached_statements=self.LOCAL_STATEMENT_CACHE_SIZE)
+        await self.local_db.execute("PRAGMA journal_mode=WAL")
+        await self.local_db.execute("PRAGMA synchronous=NORMAL")
+        # Wait up to 5s for a lock instead of failing with SQLITE_BUSY
+        await self.local_db.execute("PRAGMA busy_timeout=5000")
+        # Keep temp tables, hot pages (~20 MB) and a 256 MB read mapping in memory
+        await self.local_db.execute("PRAGMA temp_store=MEMORY")
+        await self.local_db.execute("PRAGMA cache_size=-20000")
+        await self.local_db.execute("PRAGMA mmap_size=268435456")
         
         # Gambling stats table
         await self.local_db.execute("""
@@ -693,6 +1086,59 @@ class SS14Currency(commands.Cog):
             ON gambling_stats(guild_id, player_id)
         """)
         
+        # Per-player gambling rollup across game types, maintained by triggers
+        async with self.local_db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'gambling_summary'"
+        ) as cursor:
+            summary_exists = await cursor.fetchone() is not None
+        await self.local_db.execute("""
+            CREATE TABLE IF NOT EXISTS gambling_summary (
+                guild_id INTEGER NOT NULL,
+                player_id TEXT NOT NULL,
+                games INTEGER DEFAULT 0,
+                net INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, player_id)
+            )
+        """)
+        await self.local_db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_gambling_summary_insert
+            AFTER INSERT ON gambling_stats
+            BEGIN
+                INSERT INTO gambling_summary (guild_id, player_id, games, net)
+                VALUES (NEW.guild_id, NEW.player_id, NEW.total_games, NEW.total_won - NEW.total_lost)
+                ON CONFLICT(guild_id, player_id) DO UPDATE SET
+                    games = games + excluded.games,
+                    net = net + excluded.net;
+            END
+        """)
+        await self.local_db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_gambling_summary_update
+            AFTER UPDATE ON gambling_stats
+            BEGIN
+                UPDATE gambling_summary SET
+                    games = games + NEW.total_games - OLD.total_games,
+                    net = net + (NEW.total_won - NEW.total_lost) - (OLD.total_won - OLD.total_lost)
+                WHERE guild_id = NEW.guild_id AND player_id = NEW.player_id;
+            END
+        """)
+        # Backfill players recorded before the summary table existed; only needed the
+        # first time, after that the triggers keep it current
+        if not summary_exists:
+            await self.local_db.execute("""
+                INSERT OR IGNORE INTO gambling_summary (guild_id, player_id, games, net)
+                SELECT guild_id, player_id, SUM(total_games), SUM(total_won - total_lost)
+                FROM gambling_stats
+                GROUP BY guild_id, player_id
+            """)
+        await self.local_db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_gambling_summary_games
+            ON gambling_summary(guild_id, games)
+        """)
+        await self.local_db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_gambling_summary_net
+            ON gambling_summary(guild_id, net)
+        """)
+        
         # Transaction history table
         await self.local_db.execute("""
             CREATE TABLE IF NOT EXISTS transaction_history (
@@ -708,22 +1154,28 @@ class SS14Currency(commands.Cog):
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Composite indexes: guild + time serves the volume/activity windows and
+        # newest-first history; the player ones serve each side of a player's history
         await self.local_db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transaction_guild
-            ON transaction_history(guild_id)
+            CREATE INDEX IF NOT EXISTS idx_transaction_guild_time
+            ON transaction_history(guild_id, timestamp)
         """)
         await self.local_db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transaction_from
-            ON transaction_history(from_player_id)
+            CREATE INDEX IF NOT EXISTS idx_transaction_from_time
+            ON transaction_history(from_player_id, guild_id, timestamp)
         """)
         await self.local_db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transaction_to
-            ON transaction_history(to_player_id)
+            CREATE INDEX IF NOT EXISTS idx_transaction_to_time
+            ON transaction_history(to_player_id, guild_id, timestamp)
         """)
+        # Covers the activity leaderboard: guild + type range, grouped players and amounts read from the index alone
         await self.local_db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transaction_timestamp
-            ON transaction_history(timestamp)
+            CREATE INDEX IF NOT EXISTS idx_transaction_guild_type_players
+            ON transaction_history(guild_id, transaction_type, from_player_id, to_player_id, amount)
         """)
+        # Superseded by the composite indexes above
+        for old_index in ("idx_transaction_guild", "idx_transaction_from", "idx_transaction_to", "idx_transaction_timestamp"):
+            await self.local_db.execute(f"DROP INDEX IF EXISTS {old_index}")
         
         # Prediction markets table
         await self.local_db.execute("""
@@ -771,10 +1223,13 @@ class SS14Currency(commands.Cog):
             CREATE INDEX IF NOT EXISTS idx_markets_guild
             ON prediction_markets(guild_id, status)
         """)
+        # market_id prefix serves the per-market totals; option_index narrows payouts and per-option stats
         await self.local_db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_bets_market
-            ON prediction_bets(market_id)
+            CREATE INDEX IF NOT EXISTS idx_bets_market_option
+            ON prediction_bets(market_id, option_index)
         """)
+        # Superseded by idx_bets_market_option
+        await self.local_db.execute("DROP INDEX IF EXISTS idx_bets_market")
         await self.local_db.execute("""
             CREATE INDEX IF NOT EXISTS idx_bets_player
             ON prediction_bets(player_id, guild_id)
@@ -789,14 +1244,40 @@ class SS14Currency(commands.Cog):
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Covers SUM(amount) per guild without touching the table
         await self.local_db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tax_guild
-            ON tax_revenue(guild_id)
+            CREATE INDEX IF NOT EXISTS idx_tax_guild_amount
+            ON tax_revenue(guild_id, amount)
         """)
+        await self.local_db.execute("DROP INDEX IF EXISTS idx_tax_guild")
 
         await self.local_db.commit()
+        # Refresh planner statistics for any index that is new or has drifted; cheap when nothing changed
+        await self.local_db.execute("PRAGMA optimize")
+
+        # WAL lets these connections read committed data while the writer is busy.
+        # Each aiosqlite connection runs on its own thread, so reads spread across them run in parallel.
+        readers = []
+        for _ in range(self.LOCAL_READER_COUNT):
+            reader = await aiosqlite.connect(
+                f"{self.local_db_path.as_uri()}?mode=ro", uri=True, cached_statements=self.LOCAL_STATEMENT_CACHE_SIZE
+            )
+            await reader.execute("PRAGMA busy_timeout=5000")
+            await reader.execute("PRAGMA temp_store=MEMORY")
+            await reader.execute("PRAGMA cache_size=-20000")
+            await reader.execute("PRAGMA mmap_size=268435456")
+            readers.append(reader)
+        self.local_readers = readers
         log.info("Local database initialized with gambling stats, transaction history, and prediction markets.")
 
+    @property
+    def local_read_db(self) -> aiosqlite.Connection:
+        """The next read-only local connection in rotation, or the writer while the readers are still being opened."""
+        if not self.local_readers:
+            return self.local_db
+        self.local_reader_turn = (self.local_reader_turn + 1) % len(self.local_readers)
+        return self.local_readers[self.local_reader_turn]
+
     async def resolve_player(
         self,
         user: typing.Union[discord.Member, str],
@@ -815,9 +1296,9 @@ class SS14Currency(commands.Cog):
 
         if isinstance(user, discord.Member):
             # Try linked account first
-            player_id = await get_player_id_from_discord(pool, user.id)
+            player_id = await self.get_player_id(pool, user.id)
             if player_id:
-                player_name = await get_user_name_from_id(self.session, player_id)
+                player_name = await self.get_user_name(player_id)
                 discord_name = user.display_name
             else:
                 # Fall back to username lookup
@@ -837,41 +1318,120 @@ class SS14Currency(commands.Cog):
             discord_name=discord_name
         )
 
-    async def check_rate_limit(self, user_id: int, guild_id: int) -> bool:
+    async def resolve_player_fast(
+        self,
+        user: typing.Union[discord.Member, str],
+        pool: asyncpg.Pool
+    ) -> Optional[PlayerInfo]:
         """
-        Checks if user has exceeded transfer rate limit.
-        Returns True if allowed, False if rate limited.
+        Like resolve_player, but skips the SS14 username lookup for linked Discord members.
+
+        The returned PlayerInfo may have player_name set to None; call
+        fill_player_name before the name is displayed.
         """
-        limit = await self.config.guild_from_id(guild_id).transfer_rate_limit()
-        window = await self.config.guild_from_id(guild_id).transfer_rate_window()
-        
-        now = asyncio.get_event_loop().time()
-        
-        if user_id not in self.transfer_timestamps:
-            self.transfer_timestamps[user_id] = []
-        
-        # Remove timestamps outside the window
-        self.transfer_timestamps[user_id] = [
-            ts for ts in self.transfer_timestamps[user_id]
-            if now - ts < window
-        ]
-        
-        if len(self.transfer_timestamps[user_id]) >= limit:
-            return False
-        
-        self.transfer_timestamps[user_id].append(now)
-        return True
+        if isinstance(user, discord.Member):
+            player_id = await self.get_player_id(pool, user.id)
+            if player_id:
+                return PlayerInfo(
+                    player_id=player_id,
+                    player_name=None,
+                    discord_name=user.display_name
+                )
+            player_id = await self.get_user_id_from_name(user.name)
+            if not player_id:
+                return None
+            return PlayerInfo(player_id=player_id, player_name=user.name)
 
-    async def get_rate_limit_wait_time(self, user_id: int, guild_id: int) -> int:
-        """Returns seconds until user can transfer again."""
-        if user_id not in self.transfer_timestamps or not self.transfer_timestamps[user_id]:
-            return 0
-        
-        window = await self.config.guild_from_id(guild_id).transfer_rate_window()
-        oldest = min(self.transfer_timestamps[user_id])
-        now = asyncio.get_event_loop().time()
+        return await self.resolve_player(user, pool)
+
+    async def fill_player_name(self, player_info: PlayerInfo) -> Optional[str]:
+        """Fetches the SS14 username for a PlayerInfo from resolve_player_fast if it is missing."""
+        if player_info.player_name is None:
+            player_info.player_name = await self.get_user_name(player_info.player_id)
+        return player_info.player_name
+
+    async def resolve_many_names(
+        self,
+        player_ids: typing.Iterable[str],
+        pool: Optional[asyncpg.Pool] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Resolves SS14 usernames concurrently, looking each distinct player ID up once.
+
+        With a pool, uncached IDs are first filled from the game DB's last_seen_user_name
+        in one query, so only players the DB has no name for reach the auth API.
+        """
+        unique_ids = list(dict.fromkeys(player_ids))
+        if pool is not None:
+            missing = [pid for pid in unique_ids if self.user_name_cache.get(pid) is None]
+            if missing:
+                try:
+                    for pid, name in (await get_last_seen_names(pool, missing)).items():
+                        self.user_name_cache.set(pid, name)
+                except Exception as e:
+                    log.error(f"Error fetching last seen names for {len(missing)} player(s): {e}", exc_info=True)
+        names = await asyncio.gather(*(self.get_user_name(pid) for pid in unique_ids))
+        return dict(zip(unique_ids, names))
+
+    async def get_escaped_user_names(
+        self,
+        player_ids: typing.List[str],
+        pool: Optional[asyncpg.Pool] = None
+    ) -> Dict[str, str]:
+        """Resolves SS14 usernames concurrently and returns them markdown-escaped, keyed by player ID string."""
+        names = await self.resolve_many_names(player_ids, pool)
+        return {
+            pid: discord.utils.escape_markdown(name or str(pid)[:8])
+            for pid, name in names.items()
+        }
+
+    def get_transfer_lock(self, user_id: int) -> asyncio.Lock:
+        """Returns the transfer lock for a user. Locks are dropped once no command holds them."""
+        lock = self.transfer_locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.transfer_locks[user_id] = lock
+        return lock
+
+    async def check_rate_limit(self, user_id: int, guild_id: int) -> tuple[bool, int]:
+        """
+        Checks if user has exceeded transfer rate limit and records the attempt if not.
+        Returns (allowed, seconds until the user can transfer again); the wait is 0 when allowed.
+        """
+        settings = await self.get_guild_settings(guild_id)
+        limit = settings["transfer_rate_limit"]
+        window = settings["transfer_rate_window"]
         
-        return max(0, int(window - (now - oldest)))
+        now = time.monotonic()
+
+        # Timestamps are appended in order, so expired ones are always at the front
+        key = (guild_id, user_id)
+        timestamps = self.transfer_timestamps.get(key)
+        if timestamps is None:
+            if len(self.transfer_timestamps) >= self.RATE_LIMIT_SWEEP_SIZE:
+                self.prune_transfer_timestamps(guild_id, now, window)
+            timestamps = self.transfer_timestamps[key] = deque()
+        while timestamps and now - timestamps[0] >= window:
+            timestamps.popleft()
+
+        if len(timestamps) >= limit:
+            oldest = timestamps[0] if timestamps else now
+            return False, max(0, int(window - (now - oldest)))
+
+        timestamps.append(now)
+        return True, 0
+
+    def prune_transfer_timestamps(self, guild_id: int, now: float, window: float):
+        """Drops this guild's users with no transfers inside its window so the tracker does not grow forever.
+
+        Other guilds' entries are left alone, since their windows may be longer than this one.
+        """
+        stale = [
+            key for key, timestamps in self.transfer_timestamps.items()
+            if key[0] == guild_id and (not timestamps or now - timestamps[-1] >= window)
+        ]
+        for key in stale:
+            del self.transfer_timestamps[key]
 
     async def confirm_large_transaction(
         self,
@@ -884,7 +1444,7 @@ class SS14Currency(commands.Cog):
         Prompts for confirmation if transaction is above threshold.
         Returns True if confirmed or below threshold, False if cancelled.
         """
-        threshold = await self.config.guild(ctx.guild).large_transaction_threshold()
+        threshold = (await self.get_guild_settings(ctx.guild.id))["large_transaction_threshold"]
         
         if amount < threshold:
             return True
@@ -924,62 +1484,59 @@ class SS14Currency(commands.Cog):
         winnings: int  # Net gain/loss
     ) -> bool:
         """Records a gambling game result in LOCAL database."""
-        if self.local_db is None:
-            await self.initialize_local_db()
+        try:
+            await self.local_db.execute(
+                GAMBLING_STATS_UPSERT,
+                gambling_stats_row(guild_id, player_id, game_type, wagered, won, winnings)
+            )
+            await self.local_db.commit()
+            return True
+        except Exception as e:
+            log.error(f"Error recording gambling stats: {e}", exc_info=True)
+            return False
+
+    async def log_gambling_outcome(
+        self,
+        guild_id: int,
+        game_type: str,
+        amount: int,
+        winner_player_id: uuid.UUID,
+        loser_player_id: uuid.UUID,
+        winner_receives: int,
+        transfer_details: Dict[str, int],
+        winner_name: str,
+        loser_name: str,
+        tax_amount: int
+    ) -> bool:
+        """Records both players' stats and the house tax in one commit and queues both transaction log rows for a head-to-head game."""
+        await self.log_transaction(
+            guild_id, "gambling", winner_receives,
+            from_player_id=loser_player_id,
+            to_player_id=winner_player_id,
+            balance_before=transfer_details['recipient_old'],
+            balance_after=transfer_details['recipient_new'],
+            notes=f"{game_type.title()} win vs {loser_name} (after {tax_amount} tax)"
+        )
+        await self.log_transaction(
+            guild_id, "gambling", -amount,
+            from_player_id=loser_player_id,
+            to_player_id=winner_player_id,
+            balance_before=transfer_details['sender_old'],
+            balance_after=transfer_details['sender_new'],
+            notes=f"{game_type.title()} loss vs {winner_name}"
+        )
         
         try:
-            player_id_str = str(player_id)
-            
-            # Check if record exists
-            async with self.local_db.execute(
-                "SELECT total_games FROM gambling_stats WHERE guild_id = ? AND player_id = ? AND game_type = ?",
-                (guild_id, player_id_str, game_type)
-            ) as cursor:
-                existing = await cursor.fetchone()
-            
-            if existing:
-                # Update existing record
-                await self.local_db.execute("""
-                    UPDATE gambling_stats SET
-                        total_games = total_games + 1,
-                        total_wins = total_wins + ?,
-                        total_losses = total_losses + ?,
-                        total_wagered = total_wagered + ?,
-                        total_won = total_won + ?,
-                        total_lost = total_lost + ?,
-                        biggest_win = MAX(biggest_win, ?),
-                        biggest_loss = MAX(biggest_loss, ?),
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE guild_id = ? AND player_id = ? AND game_type = ?
-                """, (
-                    1 if won else 0,  # wins
-                    0 if won else 1,  # losses
-                    wagered,
-                    max(0, winnings),  # total_won
-                    max(0, -winnings), # total_lost
-                    max(0, winnings),  # biggest_win
-                    max(0, -winnings), # biggest_loss
-                    guild_id, player_id_str, game_type
-                ))
-            else:
-                # Insert new record
-                await self.local_db.execute("""
-                    INSERT INTO gambling_stats (
-                        guild_id, player_id, game_type, total_games, total_wins, total_losses,
-                        total_wagered, total_won, total_lost, biggest_win, biggest_loss
-                    ) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    guild_id, player_id_str, game_type,
-                    1 if won else 0,  # wins
-                    0 if won else 1,  # losses
-                    wagered,
-                    max(0, winnings),  # total_won
-                    max(0, -winnings), # total_lost
-                    max(0, winnings),  # biggest_win
-                    max(0, -winnings)  # biggest_loss
-                ))
-            
+            await self.local_db.executemany(GAMBLING_STATS_UPSERT, [
+                # Net for winner is reduced by tax
+                gambling_stats_row(guild_id, winner_player_id, game_type, amount, True, winner_receives),
+                gambling_stats_row(guild_id, loser_player_id, game_type, amount, False, -amount)
+            ])
+            if tax_amount > 0:
+                await self.local_db.execute(TAX_REVENUE_INSERT, (guild_id, game_type, tax_amount))
             await self.local_db.commit()
+            if tax_amount > 0:
+                self.stats_cache.pop(("tax", guild_id))
             return True
         except Exception as e:
             log.error(f"Error recording gambling stats: {e}", exc_info=True)
@@ -991,15 +1548,14 @@ class SS14Currency(commands.Cog):
         player_id: uuid.UUID
     ) -> list:
         """Gets gambling statistics from LOCAL database."""
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
         player_id_str = str(player_id)
         
-        async with self.local_db.execute("""
+        async with self.local_read_db.execute("""
             SELECT
                 game_type, total_games, total_wins, total_losses,
-                total_wagered, total_won, total_lost, biggest_win, biggest_loss
+                total_wagered, total_won, total_lost, biggest_win, biggest_loss,
+                CASE WHEN total_games > 0 THEN total_wins * 100.0 / total_games ELSE 0 END as win_rate,
+                total_won - total_lost as net_profit
             FROM gambling_stats
             WHERE guild_id = ? AND player_id = ?
         """, (guild_id, player_id_str)) as cursor:
@@ -1016,7 +1572,9 @@ class SS14Currency(commands.Cog):
                 'total_won': row[5],
                 'total_lost': row[6],
                 'biggest_win': row[7],
-                'biggest_loss': row[8]
+                'biggest_loss': row[8],
+                'win_rate': row[9],
+                'net_profit': row[10]
             }
             for row in rows
         ]
@@ -1031,32 +1589,54 @@ class SS14Currency(commands.Cog):
         balance_before: Optional[int] = None,
         balance_after: Optional[int] = None,
         notes: Optional[str] = None
-    ) -> bool:
-        """Logs a transaction to the local database."""
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
+    ) -> None:
+        """
+        Queues a transaction to be written to the local database by the background log worker.
+        Nothing is reported back: write failures happen later in the worker, which logs them.
+        """
+        self.log_queue.put_nowait(transaction_row(
+            guild_id, transaction_type, amount, from_player_id, to_player_id, balance_before, balance_after, notes
+        ))
+
+    async def write_transaction_rows(self, rows: list) -> bool:
+        """Writes a batch of queued transaction rows to the local database in one transaction."""
         try:
-            await self.local_db.execute("""
-                INSERT INTO transaction_history
-                (guild_id, transaction_type, from_player_id, to_player_id, amount, balance_before, balance_after, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                guild_id,
-                transaction_type,
-                str(from_player_id) if from_player_id else None,
-                str(to_player_id) if to_player_id else None,
-                amount,
-                balance_before,
-                balance_after,
-                notes
-            ))
+            # sqlite3 opens one implicit transaction for the whole executemany
+            await self.local_db.executemany(TRANSACTION_HISTORY_INSERT, rows)
             await self.local_db.commit()
             return True
         except Exception as e:
-            log.error(f"Error logging transaction: {e}", exc_info=True)
+            log.error(f"Error logging {len(rows)} transaction(s): {e}", exc_info=True)
             return False
 
+    async def transaction_log_worker(self):
+        """
+        Background task that writes queued transactions off the command path.
+
+        Rows are collected for up to LOG_BATCH_WINDOW seconds or LOG_BATCH_SIZE rows
+        and committed together. A None in the queue flushes the batch and stops the worker.
+        """
+        stopping = False
+        while not stopping:
+            row = await self.log_queue.get()
+            if row is None:
+                break
+            rows = [row]
+            deadline = time.monotonic() + self.LOG_BATCH_WINDOW
+            while len(rows) < self.LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self.log_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                rows.append(row)
+            await self.write_transaction_rows(rows)
+
     async def get_transaction_history(
         self,
         guild_id: int,
@@ -1064,9 +1644,6 @@ class SS14Currency(commands.Cog):
         limit: int = 10
     ) -> list:
         """Gets transaction history from local database."""
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
         player_id_str = str(player_id) if player_id else None
         
         if player_id_str:
@@ -1090,7 +1667,7 @@ class SS14Currency(commands.Cog):
             """
             params = (guild_id, limit)
         
-        async with self.local_db.execute(query, params) as cursor:
+        async with self.local_read_db.execute(query, params) as cursor:
             rows = await cursor.fetchall()
         
         return [
@@ -1107,79 +1684,172 @@ class SS14Currency(commands.Cog):
             for row in rows
         ]
 
-    async def get_wealth_distribution(self, pool: asyncpg.Pool) -> dict:
-        """Gets wealth distribution statistics."""
+    async def get_wealth_distribution(self, pool: asyncpg.Pool) -> Optional[asyncpg.Record]:
+        """
+        Gets wealth distribution statistics in a single round-trip.
+
+        The result is a snapshot of the whole player table and is reused for WEALTH_CACHE_TTL seconds.
+        """
+        key = pool
+        stats = self.wealth_cache.get(key)
+        if stats is not None:
+            return stats
         async with pool.acquire() as conn:
             stats = await conn.fetchrow("""
+                WITH agg AS (
+                    SELECT
+                        COUNT(*) as total_players,
+                        SUM(server_currency) as total_wealth,
+                        AVG(server_currency) as avg_wealth,
+                        MIN(server_currency) as min_wealth,
+                        MAX(server_currency) as max_wealth,
+                        -- One sort serves all three quartiles
+                        PERCENTILE_CONT(ARRAY[0.25, 0.5, 0.75]) WITHIN GROUP (ORDER BY server_currency) as pct
+                    FROM player
+                    WHERE server_currency > 0
+                ), w AS (
+                    SELECT
+                        total_players, total_wealth, avg_wealth, min_wealth, max_wealth,
+                        pct[2] as median_wealth,
+                        pct[1] as q1_wealth,
+                        pct[3] as q3_wealth
+                    FROM agg
+                )
                 SELECT
-                    COUNT(*) as total_players,
-                    SUM(server_currency) as total_wealth,
-                    AVG(server_currency) as avg_wealth,
-                    MIN(server_currency) as min_wealth,
-                    MAX(server_currency) as max_wealth,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY server_currency) as median_wealth,
-                    PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY server_currency) as q1_wealth,
-                    PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY server_currency) as q3_wealth
-                FROM player
-                WHERE server_currency > 0
+                    w.*,
+                    max_wealth - min_wealth as wealth_range,
+                    q3_wealth - q1_wealth as iqr,
+                    -- Avg/median deviation in percent; NULL when there is no median
+                    CASE WHEN median_wealth > 0
+                        THEN (avg_wealth::float8 - median_wealth) / median_wealth * 100
+                    END as inequality
+                FROM w
             """)
-            
-            return dict(stats) if stats else {}
+        if stats is not None:
+            self.wealth_cache.set(key, stats)
+        return stats
+
+    async def get_wealth_leaderboard(self, pool: asyncpg.Pool, ascending: bool = False) -> list:
+        """Gets the top 10 richest (or poorest) players, cached for STATS_CACHE_TTL seconds."""
+        key = ("wealth_board", pool, ascending)
+        rows = self.stats_cache.get(key)
+        if rows is not None:
+            return rows
+        rows = await (get_leaderboardasc(pool) if ascending else get_leaderboard(pool))
+        self.stats_cache.set(key, rows)
+        return rows
+
+    async def get_local_leaderboard(self, guild_id: int, board: str) -> list:
+        """Gets the top 10 rows for a LOCAL_LEADERBOARD_QUERIES board, cached for STATS_CACHE_TTL seconds."""
+        key = ("local_board", guild_id, board)
+        rows = self.stats_cache.get(key)
+        if rows is not None:
+            return rows
+        
+        async with self.local_read_db.execute(LOCAL_LEADERBOARD_QUERIES[board], (guild_id,)) as cursor:
+            rows = await cursor.fetchall()
+        self.stats_cache.set(key, rows)
+        return rows
 
     async def get_transaction_volume(self, guild_id: int, hours: int = 24) -> dict:
-        """Gets transaction volume statistics for the specified time period."""
-        if self.local_db is None:
-            await self.initialize_local_db()
+        """Gets transaction volume statistics for the specified time period. Results are cached for STATS_CACHE_TTL seconds."""
+        key = ("volume", guild_id, hours)
+        volume = self.stats_cache.get(key)
+        if volume is not None:
+            return volume
         
-        async with self.local_db.execute("""
+        async with self.local_read_db.execute("""
             SELECT
                 COUNT(*) as transaction_count,
-                SUM(amount) as total_volume,
-                AVG(amount) as avg_transaction,
-                MAX(amount) as largest_transaction
+                COALESCE(SUM(amount), 0) as total_volume,
+                COALESCE(AVG(amount), 0) as avg_transaction,
+                COALESCE(MAX(amount), 0) as largest_transaction
             FROM transaction_history
             WHERE guild_id = ?
-            AND timestamp >= datetime('now', '-' || ? || ' hours')
-        """, (guild_id, hours)) as cursor:
+            AND timestamp >= ?
+        """, (guild_id, sqlite_cutoff(hours))) as cursor:
             row = await cursor.fetchone()
             
-        if row:
-            return {
-                'count': row[0] or 0,
-                'total': row[1] or 0,
-                'average': row[2] or 0,
-                'largest': row[3] or 0
-            }
-        return {'count': 0, 'total': 0, 'average': 0, 'largest': 0}
+        # An aggregate without GROUP BY always yields exactly one row
+        volume = dict(zip(('count', 'total', 'average', 'largest'), row))
+        self.stats_cache.set(key, volume)
+        return volume
+
+    async def get_economy_activity(self, guild_id: int) -> tuple[dict, dict, int, int]:
+        """Gets (volume_24h, volume_7d, gambling_count_24h, market_count_24h) in one pass over the last week.
+
+        The volumes have the same shape as get_transaction_volume and are cached under its keys too.
+        Results are cached for STATS_CACHE_TTL seconds.
+        """
+        key = ("economy_activity", guild_id)
+        activity = self.stats_cache.get(key)
+        if activity is not None:
+            return activity
+        
+        # The 24h figures are conditional aggregates inside the 7d range scan
+        async with self.local_read_db.execute("""
+            SELECT
+                COALESCE(SUM(timestamp >= :day), 0),
+                COALESCE(SUM(CASE WHEN timestamp >= :day THEN amount END), 0),
+                COALESCE(AVG(CASE WHEN timestamp >= :day THEN amount END), 0),
+                COALESCE(MAX(CASE WHEN timestamp >= :day THEN amount END), 0),
+                COUNT(*),
+                COALESCE(SUM(amount), 0),
+                COALESCE(AVG(amount), 0),
+                COALESCE(MAX(amount), 0),
+                COALESCE(SUM(timestamp >= :day AND transaction_type = 'gambling'), 0),
+                COALESCE(SUM(timestamp >= :day AND transaction_type IN ('market_bet', 'market_win')), 0)
+            FROM transaction_history
+            WHERE guild_id = :guild_id AND timestamp >= :week
+        """, {"guild_id": guild_id, "day": sqlite_cutoff(24), "week": sqlite_cutoff(168)}) as cursor:
+            row = await cursor.fetchone()
+        
+        fields = ('count', 'total', 'average', 'largest')
+        volume_24h = dict(zip(fields, row[0:4]))
+        volume_7d = dict(zip(fields, row[4:8]))
+        activity = (volume_24h, volume_7d, row[8], row[9])
+        self.stats_cache.set(("volume", guild_id, 24), volume_24h)
+        self.stats_cache.set(("volume", guild_id, 168), volume_7d)
+        self.stats_cache.set(key, activity)
+        return activity
+
+    async def get_bet_target(self, guild_id: int, market_id: str, option: int) -> Optional[tuple]:
+        """Gets (question, status, option_text) for a market in this guild, or None. option_text is None if the option doesn't exist."""
+        async with self.local_db.execute("""
+            SELECT m.question, m.status, o.option_text
+            FROM prediction_markets m
+            LEFT JOIN market_options o ON o.market_id = m.market_id AND o.option_index = ?
+            WHERE m.market_id = ? AND m.guild_id = ?
+        """, (option, market_id, guild_id)) as cursor:
+            return await cursor.fetchone()
 
     async def record_tax(self, guild_id: int, tax_type: str, amount: int) -> bool:
         """Records tax revenue in the local database."""
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
         try:
-            await self.local_db.execute("""
-                INSERT INTO tax_revenue (guild_id, tax_type, amount)
-                VALUES (?, ?, ?)
-            """, (guild_id, tax_type, amount))
+            await self.local_db.execute(TAX_REVENUE_INSERT, (guild_id, tax_type, amount))
             await self.local_db.commit()
+            self.stats_cache.pop(("tax", guild_id))
             return True
         except Exception as e:
             log.error(f"Error recording tax: {e}", exc_info=True)
             return False
 
     async def get_total_tax_revenue(self, guild_id: int) -> int:
-        """Gets total tax revenue collected for a guild."""
-        if self.local_db is None:
-            await self.initialize_local_db()
+        """Gets total tax revenue collected for a guild. Cached until new tax is recorded or STATS_CACHE_TTL expires."""
+        key = ("tax", guild_id)
+        total = self.stats_cache.get(key)
+        if total is not None:
+            return total
         
-        async with self.local_db.execute("""
+        async with self.local_read_db.execute("""
             SELECT COALESCE(SUM(amount), 0)
             FROM tax_revenue
             WHERE guild_id = ?
         """, (guild_id,)) as cursor:
             result = await cursor.fetchone()
-            return result[0] if result else 0
+        total = result[0] if result else 0
+        self.stats_cache.set(key, total)
+        return total
 
     @commands.group(name="currency")
     @commands.guild_only()
@@ -1195,7 +1865,7 @@ class SS14Currency(commands.Cog):
             await ctx.send("Database connection is not configured for this server.", ephemeral=True)
             return
 
-        player_id = await get_player_id_from_discord(pool, ctx.author.id)
+        player_id = await self.get_player_id(pool, ctx.author.id)
         if not player_id:
             await ctx.send("Your Discord account is not linked to an SS14 account. Please link your account in https://discord.com/channels/1202734573247795300/1330738082378551326.", ephemeral=True)
             return
@@ -1250,7 +1920,7 @@ class SS14Currency(commands.Cog):
             await ctx.send("You cannot set a negative coin balance.", ephemeral=True)
             return
 
-        player_info = await self.resolve_player(user, pool)
+        player_info = await self.resolve_player_fast(user, pool)
         if not player_info:
             if isinstance(user, discord.Member):
                 await ctx.send(f"{user.mention} does not have a linked SS14 account.", ephemeral=True)
@@ -1264,6 +1934,7 @@ class SS14Currency(commands.Cog):
             return
 
         success, old_balance = await set_player_currency(pool, player_info.player_id, amount)
+        await self.fill_player_name(player_info)
         if success:
             # Log transaction
             await self.log_transaction(
@@ -1324,16 +1995,18 @@ class SS14Currency(commands.Cog):
 
         # Deduct coins
         success, old_balance, new_balance = await add_player_currency(pool, player_info.player_id, -COST)
-        await self.record_tax(ctx.guild.id, "flex", COST)
         if not success:
             await ctx.send("❌ Failed to deduct coins.", ephemeral=True)
             return
 
+        # The coins are gone either way; commit the tax while the Discord calls are in flight
+        tax_task = asyncio.create_task(self.record_tax(ctx.guild.id, "flex", COST))
+
         # Give role
         try:
             await ctx.author.add_roles(flex_role, reason="Used flex command")
         except discord.Forbidden:
-            await ctx.send("❌ I do not have permission to assign roles.", ephemeral=True)
+            await asyncio.gather(ctx.send("❌ I do not have permission to assign roles.", ephemeral=True), tax_task)
             return
 
         # Log transaction
@@ -1354,7 +2027,7 @@ class SS14Currency(commands.Cog):
         embed.add_field(name="💰 Cost", value=f"-{COST:,} coins", inline=True)
         embed.add_field(name="💰 New Balance", value=f"{new_balance:,} coins", inline=True)
         embed.add_field(name="🏆 Role Granted", value=flex_role.mention)
-        await ctx.send(embed=embed)
+        await asyncio.gather(ctx.send(embed=embed), tax_task)
 
     @currency.command(name="add")
     @checks.admin_or_permissions(manage_guild=True)
@@ -1365,7 +2038,7 @@ class SS14Currency(commands.Cog):
             await ctx.send("Database connection is not configured for this server.", ephemeral=True)
             return
 
-        player_info = await self.resolve_player(user, pool)
+        player_info = await self.resolve_player_fast(user, pool)
         if not player_info:
             if isinstance(user, discord.Member):
                 await ctx.send(f"{user.mention} does not have a linked SS14 account.", ephemeral=True)
@@ -1380,6 +2053,7 @@ class SS14Currency(commands.Cog):
                 return
 
         success, old_balance, new_balance = await add_player_currency(pool, player_info.player_id, amount)
+        await self.fill_player_name(player_info)
         if success:
             # Log transaction
             await self.log_transaction(
@@ -1421,83 +2095,88 @@ class SS14Currency(commands.Cog):
             await ctx.send("You must transfer a positive amount of coins.", ephemeral=True)
             return
 
-        # Check rate limit
-        if not await self.check_rate_limit(ctx.author.id, ctx.guild.id):
-            wait_time = await self.get_rate_limit_wait_time(ctx.author.id, ctx.guild.id)
-            ready_timestamp = int(time.time() + wait_time)
-            await ctx.send(
-                f"⏱️ You're transferring too quickly! Try again <t:{ready_timestamp}:R>.",
-                ephemeral=True
-            )
-            return
+        # Serialize transfers per sender so concurrent commands cannot both pass
+        # the rate limit and balance checks before either debit lands
+        async with self.get_transfer_lock(ctx.author.id):
+            # Check rate limit
+            allowed, wait_time = await self.check_rate_limit(ctx.author.id, ctx.guild.id)
+            if not allowed:
+                ready_timestamp = int(time.time() + wait_time)
+                await ctx.send(
+                    f"⏱️ You're transferring too quickly! Try again <t:{ready_timestamp}:R>.",
+                    ephemeral=True
+                )
+                return
 
-        sender_id = await get_player_id_from_discord(pool, ctx.author.id)
-        if not sender_id:
-            await ctx.send("Your Discord account is not linked to an SS14 account. Please link your account in https://discord.com/channels/1202734573247795300/1330738082378551326.", ephemeral=True)
-            return
+            sender_id = await self.get_player_id(pool, ctx.author.id)
+            if not sender_id:
+                await ctx.send("Your Discord account is not linked to an SS14 account. Please link your account in https://discord.com/channels/1202734573247795300/1330738082378551326.", ephemeral=True)
+                return
 
-        recipient_info = await self.resolve_player(recipient, pool)
-        if not recipient_info:
-            if isinstance(recipient, discord.Member):
-                await ctx.send(f"{recipient.mention} does not have a linked SS14 account. They can link their account in https://discord.com/channels/1202734573247795300/1330738082378551326.", ephemeral=True)
-            else:
-                await ctx.send(f"Could not find a user with the name `{recipient}`.", ephemeral=True)
-            return
+            recipient_info = await self.resolve_player_fast(recipient, pool)
+            if not recipient_info:
+                if isinstance(recipient, discord.Member):
+                    await ctx.send(f"{recipient.mention} does not have a linked SS14 account. They can link their account in https://discord.com/channels/1202734573247795300/1330738082378551326.", ephemeral=True)
+                else:
+                    await ctx.send(f"Could not find a user with the name `{recipient}`.", ephemeral=True)
+                return
 
-        if sender_id == recipient_info.player_id:
-            await ctx.send("You cannot transfer coins to yourself.", ephemeral=True)
-            return
+            if sender_id == recipient_info.player_id:
+                await ctx.send("You cannot transfer coins to yourself.", ephemeral=True)
+                return
 
-        # Check for large transaction confirmation
-        target_name = recipient_info.discord_name or recipient_info.player_name
-        if not await self.confirm_large_transaction(ctx, amount, "transfer", f"to {target_name}"):
-            return
+            # Check for large transaction confirmation
+            target_name = recipient_info.discord_name or recipient_info.player_name
+            if not await self.confirm_large_transaction(ctx, amount, "transfer", f"to {target_name}"):
+                return
 
-        transfer_details = await transfer_currency(pool, sender_id, recipient_info.player_id, amount)
-        if transfer_details:
-            # Log transaction for sender
-            await self.log_transaction(
-                ctx.guild.id, "transfer", -amount,
-                from_player_id=sender_id,
-                to_player_id=recipient_info.player_id,
-                balance_before=transfer_details['sender_old'],
-                balance_after=transfer_details['sender_new'],
-                notes=f"Sent to {recipient_info.player_name}"
-            )
+            transfer_details = await transfer_currency(pool, sender_id, recipient_info.player_id, amount)
+            if transfer_details:
+                await self.fill_player_name(recipient_info)
+
+                # Log transaction for sender
+                await self.log_transaction(
+                    ctx.guild.id, "transfer", -amount,
+                    from_player_id=sender_id,
+                    to_player_id=recipient_info.player_id,
+                    balance_before=transfer_details['sender_old'],
+                    balance_after=transfer_details['sender_new'],
+                    notes=f"Sent to {recipient_info.player_name}"
+                )
             
-            # Log transaction for recipient
-            await self.log_transaction(
-                ctx.guild.id, "transfer", amount,
-                from_player_id=sender_id,
-                to_player_id=recipient_info.player_id,
-                balance_before=transfer_details['recipient_old'],
-                balance_after=transfer_details['recipient_new'],
-                notes=f"Received from {ctx.author.name}"
-            )
+                # Log transaction for recipient
+                await self.log_transaction(
+                    ctx.guild.id, "transfer", amount,
+                    from_player_id=sender_id,
+                    to_player_id=recipient_info.player_id,
+                    balance_before=transfer_details['recipient_old'],
+                    balance_after=transfer_details['recipient_new'],
+                    notes=f"Received from {ctx.author.name}"
+                )
             
-            sender_name = await get_user_name_from_id(self.session, sender_id)
-            sender_name_escaped = discord.utils.escape_markdown(sender_name)
-            sender_discord_name_escaped = discord.utils.escape_markdown(ctx.author.display_name)
-            embed = discord.Embed(title="✅ Transfer Successful", color=discord.Color.green())
-            embed.set_footer(text=f"Transfer completed", icon_url=ctx.author.display_avatar.url)
-
-            sender_field_name = f"📤 Sender: {sender_discord_name_escaped} ({sender_name_escaped})"
-            sender_field_value = f"`{transfer_details['sender_old']:,}` ➜ `{transfer_details['sender_new']:,}`"
-            embed.add_field(name=sender_field_name, value=sender_field_value, inline=False)
-
-            recipient_name_escaped = discord.utils.escape_markdown(recipient_info.player_name)
-            if recipient_info.discord_name:
-                recipient_discord_name_escaped = discord.utils.escape_markdown(recipient_info.discord_name)
-                recipient_field_name = f"📥 Recipient: {recipient_discord_name_escaped} ({recipient_name_escaped})"
-            else:
-                recipient_field_name = f"📥 Recipient: {recipient_name_escaped}"
-            recipient_field_value = f"`{transfer_details['recipient_old']:,}` ➜ `{transfer_details['recipient_new']:,}`"
-            embed.add_field(name=recipient_field_name, value=recipient_field_value, inline=False)
+                sender_name = await self.get_user_name(sender_id)
+                sender_name_escaped = discord.utils.escape_markdown(sender_name)
+                sender_discord_name_escaped = discord.utils.escape_markdown(ctx.author.display_name)
+                embed = discord.Embed(title="✅ Transfer Successful", color=discord.Color.green())
+                embed.set_footer(text=f"Transfer completed", icon_url=ctx.author.display_avatar.url)
 
-            embed.add_field(name="💸 Amount", value=f"{amount:,} coins", inline=False)
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send("❌ The transfer failed. This may be due to insufficient funds or an issue with the recipient's account.", ephemeral=True)
+                sender_field_name = f"📤 Sender: {sender_discord_name_escaped} ({sender_name_escaped})"
+                sender_field_value = balance_change(transfer_details['sender_old'], transfer_details['sender_new'])
+                embed.add_field(name=sender_field_name, value=sender_field_value, inline=False)
+
+                recipient_name_escaped = discord.utils.escape_markdown(recipient_info.player_name)
+                if recipient_info.discord_name:
+                    recipient_discord_name_escaped = discord.utils.escape_markdown(recipient_info.discord_name)
+                    recipient_field_name = f"📥 Recipient: {recipient_discord_name_escaped} ({recipient_name_escaped})"
+                else:
+                    recipient_field_name = f"📥 Recipient: {recipient_name_escaped}"
+                recipient_field_value = balance_change(transfer_details['recipient_old'], transfer_details['recipient_new'])
+                embed.add_field(name=recipient_field_name, value=recipient_field_value, inline=False)
+
+                embed.add_field(name="💸 Amount", value=f"{amount:,} coins", inline=False)
+                await ctx.send(embed=embed)
+            else:
+                await ctx.send("❌ The transfer failed. This may be due to insufficient funds or an issue with the recipient's account.", ephemeral=True)
 
     @currency.command(name="history")
     async def transaction_history(self, ctx: commands.Context, user: Optional[typing.Union[discord.Member, str]] = None, limit: int = 10):
@@ -1511,7 +2190,7 @@ class SS14Currency(commands.Cog):
         if user is None:
             # Show own history
             target = ctx.author
-            player_id = await get_player_id_from_discord(pool, target.id)
+            player_id = await self.get_player_id(pool, target.id)
             if not player_id:
                 await ctx.send("Your Discord account is not linked to an SS14 account.", ephemeral=True)
                 return
@@ -1543,6 +2222,14 @@ class SS14Currency(commands.Cog):
             color=discord.Color.blue()
         )
         
+        # Resolve every counterparty up front so the lookups run concurrently
+        player_id_str = str(player_id)
+        counterparty_ids = [
+            tx['to_player_id'] if player_id_str == tx['from_player_id'] else tx['from_player_id']
+            for tx in history if tx['type'] == "transfer"
+        ]
+        counterparty_names = await self.resolve_many_names((pid for pid in counterparty_ids if pid), pool)
+
         for i, tx in enumerate(history, 1):
             tx_type = tx['type']
             amount = tx['amount']
@@ -1552,41 +2239,31 @@ class SS14Currency(commands.Cog):
             # Get other party information
             other_party = ""
             if tx_type == "transfer":
-                if str(player_id) == tx['from_player_id']:
+                if player_id_str == tx['from_player_id']:
                     direction = "📤 Sent"
                     if tx['to_player_id']:
-                        other_player_id = uuid.UUID(tx['to_player_id'])
-                        other_name = await get_user_name_from_id(self.session, other_player_id)
+                        other_name = counterparty_names.get(tx['to_player_id'])
                         other_party = f"**To:** {discord.utils.escape_markdown(other_name or 'Unknown')}\n"
                 else:
                     direction = "📥 Received"
                     if tx['from_player_id']:
-                        other_player_id = uuid.UUID(tx['from_player_id'])
-                        other_name = await get_user_name_from_id(self.session, other_player_id)
+                        other_name = counterparty_names.get(tx['from_player_id'])
                         other_party = f"**From:** {discord.utils.escape_markdown(other_name or 'Unknown')}\n"
-            elif tx_type == "gambling":
-                direction = "🎲 Gambling"
-                # Amount will be positive for wins, negative for losses
-            elif tx_type == "admin_set":
-                direction = "⚙️ Balance Set"
-            elif tx_type == "admin_add":
-                direction = "⚙️ Admin Adjusted"
-            elif tx_type == "market_bet":
-                direction = "📈 Market Bet"
-            elif tx_type == "market_win":
-                direction = "💰 Market Win"
             else:
-                direction = tx_type
+                # Gambling amounts are positive for wins, negative for losses
+                direction = _HISTORY_DIRECTIONS.get(tx_type, tx_type)
             
+            balance_before = tx['balance_before']
+            balance_after = tx['balance_after']
             balance_info = ""
-            if tx['balance_before'] is not None and tx['balance_after'] is not None:
-                balance_info = f"**Balance:** `{tx['balance_before']:,}` ➜ `{tx['balance_after']:,}`\n"
+            if balance_before is not None and balance_after is not None:
+                balance_info = f"**Balance:** {balance_change(balance_before, balance_after)}\n"
             
             field_value = (
                 f"{other_party}"
                 f"**Amount:** {amount:+,} coins\n"
                 f"{balance_info}"
-                f"**Time:** {timestamp[:19]}\n"
+                f"**Time:** {discord_timestamp(timestamp)}\n"
                 f"**Notes:** {notes}"
             )
             
@@ -1621,6 +2298,8 @@ class SS14Currency(commands.Cog):
         max_w = float(stats.get('max_wealth', 0))
         q1 = float(stats.get('q1_wealth', 0))
         q3 = float(stats.get('q3_wealth', 0))
+        wealth_range = int(stats.get('wealth_range', 0))
+        iqr = float(stats.get('iqr', 0))
 
         embed = discord.Embed(
             title="📊 Wealth Distribution Analysis",
@@ -1655,7 +2334,7 @@ class SS14Currency(commands.Cog):
         )
         embed.add_field(
             name="🎯 Range",
-            value=f"{int(max_w - min_w):,} coins",
+            value=f"{wealth_range:,} coins",
             inline=True
         )
         embed.add_field(
@@ -1670,13 +2349,13 @@ class SS14Currency(commands.Cog):
         )
         embed.add_field(
             name="📏 IQR (Interquartile Range)",
-            value=f"{int(q3 - q1):,} coins",
+            value=f"{int(iqr):,} coins",
             inline=True
         )
         
-        # Calculate wealth inequality (Gini-like metric using quartiles)
-        if median > 0:
-            inequality = ((avg - median) / median) * 100
+        # Wealth inequality (avg/median deviation, computed in SQL)
+        inequality = stats.get('inequality')
+        if inequality is not None:
             embed.add_field(
                 name="⚖️ Inequality Index",
                 value=f"{inequality:.1f}% (avg/median deviation)",
@@ -1743,7 +2422,7 @@ class SS14Currency(commands.Cog):
         
         if category in ["wealth", "rich", "coins", "balance"]:
             # Existing wealth leaderboard
-            leaderboard_data = await get_leaderboard(pool)
+            leaderboard_data = await self.get_wealth_leaderboard(pool)
             if not leaderboard_data:
                 await ctx.send("The leaderboard is currently empty.")
                 return
@@ -1754,7 +2433,7 @@ class SS14Currency(commands.Cog):
                 color=discord.Color.gold()
             )
             for i, record in enumerate(leaderboard_data, 1):
-                medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+                medal = _MEDALS[i - 1] if i <= 3 else f"{i}."
                 embed.add_field(
                     name=f"{medal} {discord.utils.escape_markdown(record['last_seen_user_name'])}",
                     value=f"{record['server_currency']:,} coins",
@@ -1763,7 +2442,7 @@ class SS14Currency(commands.Cog):
 
         elif category in ["poor", "broke", "destitute"]:
             # Existing wealth leaderboard
-            leaderboard_data = await get_leaderboardasc(pool)
+            leaderboard_data = await self.get_wealth_leaderboard(pool, ascending=True)
             if not leaderboard_data:
                 await ctx.send("The leaderboard is currently empty.")
                 return
@@ -1774,7 +2453,7 @@ class SS14Currency(commands.Cog):
                 color=discord.Color.red()
             )
             for i, record in enumerate(leaderboard_data, 1):
-                medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+                medal = _MEDALS[i - 1] if i <= 3 else f"{i}."
                 embed.add_field(
                     name=f"{medal} {discord.utils.escape_markdown(record['last_seen_user_name'])}",
                     value=f"{record['server_currency']:,} coins",
@@ -1783,18 +2462,7 @@ class SS14Currency(commands.Cog):
 
         elif category in ["gambling", "gambler", "gamblers", "games"]:
             # Gambling leaderboard (most games played)
-            if self.local_db is None:
-                await self.initialize_local_db()
-            
-            async with self.local_db.execute("""
-                SELECT player_id, SUM(total_games) as games, SUM(total_won - total_lost) as net_profit
-                FROM gambling_stats
-                WHERE guild_id = ?
-                GROUP BY player_id
-                ORDER BY games DESC
-                LIMIT 10
-            """, (ctx.guild.id,)) as cursor:
-                rows = await cursor.fetchall()
+            rows = await self.get_local_leaderboard(ctx.guild.id, "games")
             
             if not rows:
                 await ctx.send("No gambling statistics available.")
@@ -1806,38 +2474,22 @@ class SS14Currency(commands.Cog):
                 color=discord.Color.purple()
             )
             
+            names = await self.get_escaped_user_names([row[0] for row in rows], pool)
+            
             for i, row in enumerate(rows, 1):
-                player_id = uuid.UUID(row[0])
-                # Try to get username from SS14
-                username = await get_user_name_from_id(self.session, player_id)
-                if not username:
-                    username = str(player_id)[:8]
-                
                 games = row[1]
                 net = row[2]
-                medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+                medal = _MEDALS[i - 1] if i <= 3 else f"{i}."
                 
                 embed.add_field(
-                    name=f"{medal} {discord.utils.escape_markdown(username)}",
+                    name=f"{medal} {names[row[0]]}",
                     value=f"**Games:** {games:,} | **Net:** {net:+,} coins",
                     inline=False
                 )
         
         elif category in ["profit", "winners", "lucky"]:
             # Gambling profit leaderboard (biggest winners)
-            if self.local_db is None:
-                await self.initialize_local_db()
-            
-            async with self.local_db.execute("""
-                SELECT player_id, SUM(total_won - total_lost) as net_profit, SUM(total_games) as games
-                FROM gambling_stats
-                WHERE guild_id = ?
-                GROUP BY player_id
-                HAVING net_profit > 0
-                ORDER BY net_profit DESC
-                LIMIT 10
-            """, (ctx.guild.id,)) as cursor:
-                rows = await cursor.fetchall()
+            rows = await self.get_local_leaderboard(ctx.guild.id, "profit")
             
             if not rows:
                 await ctx.send("No gambling profit data available.")
@@ -1849,37 +2501,22 @@ class SS14Currency(commands.Cog):
                 color=discord.Color.green()
             )
             
+            names = await self.get_escaped_user_names([row[0] for row in rows], pool)
+            
             for i, row in enumerate(rows, 1):
-                player_id = uuid.UUID(row[0])
-                username = await get_user_name_from_id(self.session, player_id)
-                if not username:
-                    username = str(player_id)[:8]
-                
-                profit = row[1]
-                games = row[2]
-                medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+                games = row[1]
+                profit = row[2]
+                medal = _MEDALS[i - 1] if i <= 3 else f"{i}."
                 
                 embed.add_field(
-                    name=f"{medal} {discord.utils.escape_markdown(username)}",
+                    name=f"{medal} {names[row[0]]}",
                     value=f"**Profit:** +{profit:,} coins | **Games:** {games:,}",
                     inline=False
                 )
         
         elif category in ["losses", "losers", "unlucky"]:
             # Gambling losses leaderboard (biggest losers)
-            if self.local_db is None:
-                await self.initialize_local_db()
-            
-            async with self.local_db.execute("""
-                SELECT player_id, SUM(total_won - total_lost) as net_profit, SUM(total_games) as games
-                FROM gambling_stats
-                WHERE guild_id = ?
-                GROUP BY player_id
-                HAVING net_profit < 0
-                ORDER BY net_profit ASC
-                LIMIT 10
-            """, (ctx.guild.id,)) as cursor:
-                rows = await cursor.fetchall()
+            rows = await self.get_local_leaderboard(ctx.guild.id, "losses")
             
             if not rows:
                 await ctx.send("No gambling loss data available.")
@@ -1891,39 +2528,22 @@ class SS14Currency(commands.Cog):
                 color=discord.Color.red()
             )
             
+            names = await self.get_escaped_user_names([row[0] for row in rows], pool)
+            
             for i, row in enumerate(rows, 1):
-                player_id = uuid.UUID(row[0])
-                username = await get_user_name_from_id(self.session, player_id)
-                if not username:
-                    username = str(player_id)[:8]
-                
-                loss = row[1]  # Will be negative
-                games = row[2]
+                games = row[1]
+                loss = row[2]  # Will be negative
                 medal = "💸" if i <= 3 else f"{i}."
                 
                 embed.add_field(
-                    name=f"{medal} {discord.utils.escape_markdown(username)}",
+                    name=f"{medal} {names[row[0]]}",
                     value=f"**Loss:** {loss:,} coins | **Games:** {games:,}",
                     inline=False
                 )
         
         elif category in ["activity", "active", "transactions"]:
             # Most active traders (by transaction count)
-            if self.local_db is None:
-                await self.initialize_local_db()
-            
-            async with self.local_db.execute("""
-                SELECT 
-                    COALESCE(from_player_id, to_player_id) as player_id,
-                    COUNT(*) as tx_count,
-                    SUM(amount) as total_volume
-                FROM transaction_history
-                WHERE guild_id = ? AND transaction_type = 'transfer'
-                GROUP BY player_id
-                ORDER BY tx_count DESC
-                LIMIT 10
-            """, (ctx.guild.id,)) as cursor:
-                rows = await cursor.fetchall()
+            rows = await self.get_local_leaderboard(ctx.guild.id, "activity")
             
             if not rows:
                 await ctx.send("No transaction activity found.")
@@ -1935,21 +2555,18 @@ class SS14Currency(commands.Cog):
                 color=discord.Color.green()
             )
             
+            names = await self.get_escaped_user_names([row[0] for row in rows if row[0]], pool)
+            
             for i, row in enumerate(rows, 1):
-                if row[0]:
-                    player_id = uuid.UUID(row[0])
-                    username = await get_user_name_from_id(self.session, player_id)
-                    if not username:
-                        username = str(player_id)[:8]
-                else:
+                if not row[0]:
                     continue
                 
                 tx_count = row[1]
                 volume = row[2]
-                medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+                medal = _MEDALS[i - 1] if i <= 3 else f"{i}."
                 
                 embed.add_field(
-                    name=f"{medal} {discord.utils.escape_markdown(username)}",
+                    name=f"{medal} {names[row[0]]}",
                     value=f"**Transactions:** {tx_count:,} | **Volume:** {volume:,} coins",
                     inline=False
                 )
@@ -1983,17 +2600,13 @@ class SS14Currency(commands.Cog):
             await ctx.send("Database connection is not configured.", ephemeral=True)
             return
 
-        # Get tax revenue
-        tax_revenue = await self.get_total_tax_revenue(ctx.guild.id)
-
-        # Get wealth distribution
-        wealth_stats = await self.get_wealth_distribution(pool)
-        
-        # Get transaction volume (24h)
-        volume_24h = await self.get_transaction_volume(ctx.guild.id, 24)
-        
-        # Get transaction volume (7d)
-        volume_7d = await self.get_transaction_volume(ctx.guild.id, 168)
+        # Wealth comes from Postgres and the rest from the local database, so
+        # fetch them concurrently rather than one after another
+        tax_revenue, wealth_stats, (volume_24h, volume_7d, gambling_count, market_count) = await asyncio.gather(
+            self.get_total_tax_revenue(ctx.guild.id),
+            self.get_wealth_distribution(pool),
+            self.get_economy_activity(ctx.guild.id)
+        )
         
         if not wealth_stats or not wealth_stats.get('total_players'):
             await ctx.send("Not enough data to calculate economic health.", ephemeral=True)
@@ -2005,44 +2618,55 @@ class SS14Currency(commands.Cog):
             color=discord.Color.blue()
         )
         
-        # Wealth metrics (convert Decimal to float/int)
-        total_wealth = float(wealth_stats.get('total_wealth', 0) or 0)
-        total_players = int(wealth_stats.get('total_players', 0) or 0)
-        avg_wealth = float(wealth_stats.get('avg_wealth', 0) or 0)
-        median_wealth = float(wealth_stats.get('median_wealth', 0) or 0)
+        # Wealth metrics (coins are whole numbers, so convert Decimal straight to int)
+        total_wealth = int(wealth_stats.get('total_wealth') or 0)
+        total_players = int(wealth_stats.get('total_players') or 0)
+        avg_wealth = int(wealth_stats.get('avg_wealth') or 0)
+
+        # Format each displayed number once; field text is filled from this map
+        m = {
+            "total_wealth": f"{total_wealth:,}",
+            "total_players": f"{total_players:,}",
+            "avg_wealth": f"{avg_wealth:,}",
+            "count_24h": f"{volume_24h['count']:,}",
+            "total_24h": f"{volume_24h['total']:,}",
+            "count_7d": f"{volume_7d['count']:,}",
+            "total_7d": f"{volume_7d['total']:,}",
+            "tax_revenue": f"{tax_revenue:,}",
+        }
 
         embed.add_field(
             name="💰 Total Wealth in Circulation",
-            value=f"{int(total_wealth):,} coins",
+            value="{total_wealth} coins".format_map(m),
             inline=False
         )
         embed.add_field(
             name="👥 Active Players",
-            value=f"{total_players:,} players",
+            value="{total_players} players".format_map(m),
             inline=True
         )
         embed.add_field(
             name="📊 Wealth per Capita",
-            value=f"{int(avg_wealth):,} coins",
+            value="{avg_wealth} coins".format_map(m),
             inline=True
         )
         
         # Activity metrics
         embed.add_field(
             name="📈 24h Activity",
-            value=f"{volume_24h['count']:,} transactions\n{volume_24h['total']:,} coins moved",
+            value="{count_24h} transactions\n{total_24h} coins moved".format_map(m),
             inline=True
         )
         embed.add_field(
             name="📊 7d Activity",
-            value=f"{volume_7d['count']:,} transactions\n{volume_7d['total']:,} coins moved",
+            value="{count_7d} transactions\n{total_7d} coins moved".format_map(m),
             inline=True
         )
         
         # Velocity (economy turnover rate)
         if total_wealth > 0:
-            daily_velocity = (volume_24h['total'] / total_wealth) * 100
-            weekly_velocity = (volume_7d['total'] / total_wealth) * 100
+            daily_velocity = volume_24h['total'] * 100 / total_wealth
+            weekly_velocity = volume_7d['total'] * 100 / total_wealth
             
             embed.add_field(
                 name="⚡ Money Velocity",
@@ -2053,13 +2677,13 @@ class SS14Currency(commands.Cog):
         # Tax Revenue
         embed.add_field(
             name="🏦 Total Tax Revenue",
-            value=f"{tax_revenue:,} coins collected",
+            value="{tax_revenue} coins collected".format_map(m),
             inline=False
         )
 
-        # Inequality metric
-        if median_wealth > 0:
-            inequality = ((avg_wealth - median_wealth) / median_wealth) * 100
+        # Inequality metric (avg/median deviation, computed in SQL), shared with the health score below
+        inequality = wealth_stats.get('inequality')
+        if inequality is not None:
             status = "🟢 Low" if inequality < 50 else "🟡 Medium" if inequality < 100 else "🔴 High"
             embed.add_field(
                 name="⚖️ Wealth Inequality",
@@ -2094,7 +2718,7 @@ class SS14Currency(commands.Cog):
         # 3. MONEY VELOCITY (0-20 points)
         # Measures how quickly money moves through the economy
         if total_wealth > 0 and volume_24h['total'] > 0:
-            daily_velocity = (volume_24h['total'] / total_wealth) * 100
+            daily_velocity = volume_24h['total'] * 100 / total_wealth
             # 5% daily velocity = 10 points, 10% = 20 points
             velocity_score = min(20, daily_velocity * 2)
             health_score += velocity_score
@@ -2104,21 +2728,9 @@ class SS14Currency(commands.Cog):
         
         # 4. WEALTH DISTRIBUTION (0-20 points)
         # Lower inequality is better
-        if median_wealth > 0:
-            inequality = ((avg_wealth - median_wealth) / median_wealth) * 100
+        if inequality is not None:
             # Inverse scoring: lower inequality = more points
-            if inequality < 25:
-                distribution_score = 20
-            elif inequality < 50:
-                distribution_score = 18
-            elif inequality < 75:
-                distribution_score = 15
-            elif inequality < 100:
-                distribution_score = 12
-            elif inequality < 150:
-                distribution_score = 8
-            else:
-                distribution_score = 5
+            distribution_score = next(points for limit, points in _INEQUALITY_TIERS if inequality < limit)
             health_score += distribution_score
             health_details.append(f"⚖️ Distribution: {distribution_score}/20 ({inequality:.1f}% inequality)")
         else:
@@ -2130,38 +2742,22 @@ class SS14Currency(commands.Cog):
         if volume_24h['count'] > 0:
             transaction_types += 1  # Has transfers
         
-        # Check for gambling activity
-        if self.local_db:
-            async with self.local_db.execute("""
-                SELECT COUNT(*) FROM transaction_history
-                WHERE guild_id = ? AND transaction_type = 'gambling'
-                AND timestamp >= datetime('now', '-24 hours')
-            """, (ctx.guild.id,)) as cursor:
-                gambling_count = (await cursor.fetchone())[0]
-                if gambling_count > 0:
-                    transaction_types += 1
-            
-            # Check for market activity
-            async with self.local_db.execute("""
-                SELECT COUNT(*) FROM transaction_history
-                WHERE guild_id = ? AND transaction_type IN ('market_bet', 'market_win')
-                AND timestamp >= datetime('now', '-24 hours')
-            """, (ctx.guild.id,)) as cursor:
-                market_count = (await cursor.fetchone())[0]
-                if market_count > 0:
-                    transaction_types += 1
+        # Check for gambling and market activity
+        if gambling_count > 0:
+            transaction_types += 1
+        if market_count > 0:
+            transaction_types += 1
         
         # 1 type = 3 points, 2 types = 7 points, 3 types = 10 points
-        diversity_map = {0: 0, 1: 3, 2: 7, 3: 10}
-        diversity_score = diversity_map.get(transaction_types, 0)
+        diversity_score = _DIVERSITY_SCORES[transaction_types]
         health_score += diversity_score
         
         type_names = []
         if volume_24h['count'] > 0:
             type_names.append("transfers")
-        if self.local_db and gambling_count > 0:
+        if gambling_count > 0:
             type_names.append("gambling")
-        if self.local_db and market_count > 0:
+        if market_count > 0:
             type_names.append("markets")
         
         types_text = ", ".join(type_names) if type_names else "none"
@@ -2170,26 +2766,9 @@ class SS14Currency(commands.Cog):
         health_score = min(100, health_score)
         
         # Determine health status and color
-        if health_score >= 85:
-            health_status = "🟢 Excellent"
-            health_color = discord.Color.green()
-            health_desc = "Thriving economy with high participation and activity"
-        elif health_score >= 70:
-            health_status = "🟢 Good"
-            health_color = discord.Color.green()
-            health_desc = "Healthy economy with solid fundamentals"
-        elif health_score >= 55:
-            health_status = "🟡 Fair"
-            health_color = discord.Color.gold()
-            health_desc = "Moderate economy with room for growth"
-        elif health_score >= 40:
-            health_status = "🟠 Needs Improvement"
-            health_color = discord.Color.orange()
-            health_desc = "Struggling economy requiring attention"
-        else:
-            health_status = "🔴 Poor"
-            health_color = discord.Color.red()
-            health_desc = "Weak economy needing significant intervention"
+        health_status, health_color, health_desc = next(
+            (status, color(), desc) for threshold, status, color, desc in _HEALTH_TIERS if health_score >= threshold
+        )
         
         embed.add_field(
             name="🏥 Economy Health Score",
@@ -2216,30 +2795,32 @@ class SS14Currency(commands.Cog):
         Args:
             status: Filter by status (open/resolved/cancelled/all). Default: open
         """
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
-        # Build query based on status filter
+        # Pick the 10 newest markets first, then aggregate bet stats for just those
+        # through idx_bets_market_option so the whole listing is one round-trip.
         if status.lower() == "all":
-            query = """
-                SELECT market_id, question, status, created_at
-                FROM prediction_markets
-                WHERE guild_id = ?
-                ORDER BY created_at DESC
-                LIMIT 10
-            """
+            status_filter = ""
             params = (ctx.guild.id,)
         else:
-            query = """
+            status_filter = "AND status = ?"
+            params = (ctx.guild.id, status.lower())
+        
+        query = f"""
+            WITH recent AS (
                 SELECT market_id, question, status, created_at
                 FROM prediction_markets
-                WHERE guild_id = ? AND status = ?
+                WHERE guild_id = ? {status_filter}
                 ORDER BY created_at DESC
                 LIMIT 10
-            """
-            params = (ctx.guild.id, status.lower())
+            )
+            SELECT r.market_id, r.question, r.status, r.created_at,
+                   COUNT(b.id), COALESCE(SUM(b.amount), 0)
+            FROM recent r
+            LEFT JOIN prediction_bets b ON b.market_id = r.market_id
+            GROUP BY r.market_id
+            ORDER BY r.created_at DESC
+        """
         
-        async with self.local_db.execute(query, params) as cursor:
+        async with self.local_read_db.execute(query, params) as cursor:
             markets = await cursor.fetchall()
         
         if not markets:
@@ -2257,17 +2838,8 @@ class SS14Currency(commands.Cog):
             question = market[1]
             mkt_status = market[2]
             created = market[3]
-            
-            # Get total bets
-            async with self.local_db.execute("""
-                SELECT COUNT(*), SUM(amount)
-                FROM prediction_bets
-                WHERE market_id = ?
-            """, (market_id,)) as cursor:
-                bet_stats = await cursor.fetchone()
-            
-            bet_count = bet_stats[0] or 0
-            total_pool = bet_stats[1] or 0
+            bet_count = market[4]
+            total_pool = market[5]
             
             status_emoji = {
                 'open': '🟢',
@@ -2295,11 +2867,8 @@ class SS14Currency(commands.Cog):
     @currency.command(name="marketinfo")
     async def market_info(self, ctx: commands.Context, market_id: str):
         """Get detailed information about a prediction market."""
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
         # Get market details
-        async with self.local_db.execute("""
+        async with self.local_read_db.execute("""
             SELECT question, status, created_at, winning_option, resolved_at
             FROM prediction_markets
             WHERE market_id = ? AND guild_id = ?
@@ -2313,7 +2882,7 @@ class SS14Currency(commands.Cog):
         question, status, created_at, winning_option, resolved_at = market
         
         # Get options with bet counts
-        async with self.local_db.execute("""
+        async with self.local_read_db.execute("""
             SELECT mo.option_index, mo.option_text,
                    COUNT(pb.id) as bet_count,
                    COALESCE(SUM(pb.amount), 0) as total_wagered
@@ -2375,9 +2944,6 @@ class SS14Currency(commands.Cog):
             await ctx.send("❌ Database connection not configured.", ephemeral=True)
             return
         
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
         # Verify market exists and is open
         async with self.local_db.execute("""
             SELECT question, status FROM prediction_markets
@@ -2404,58 +2970,64 @@ class SS14Currency(commands.Cog):
             await ctx.send(f"❌ Invalid winning option {winning_option}.", ephemeral=True)
             return
         
-        # Get all bets
+        # Total pool and winning pool in one aggregate
         async with self.local_db.execute("""
-            SELECT option_index, SUM(amount) as total
+            SELECT
+                COALESCE(SUM(amount), 0) as total,
+                COALESCE(SUM(CASE WHEN option_index = ? THEN amount END), 0) as winning
             FROM prediction_bets
             WHERE market_id = ?
-            GROUP BY option_index
-        """, (market_id,)) as cursor:
-            option_totals = await cursor.fetchall()
-        
-        # Calculate total pool and winning pool
-        total_pool = sum(row[1] for row in option_totals)
-        winning_pool = next((row[1] for row in option_totals if row[0] == winning_option), 0)
+        """, (winning_option, market_id)) as cursor:
+            total_pool, winning_pool = await cursor.fetchone()
         
         if winning_pool == 0:
             await ctx.send("⚠️ No one bet on the winning option. Resolving market anyway.", ephemeral=True)
         
-        # Get winning bets
+        # Get winning stakes, one row per player so each winner is credited once
         async with self.local_db.execute("""
-            SELECT player_id, amount
+            SELECT player_id, SUM(amount)
             FROM prediction_bets
             WHERE market_id = ? AND option_index = ?
+            GROUP BY player_id
         """, (market_id, winning_option)) as cursor:
             winning_bets = await cursor.fetchall()
         
-        # Distribute winnings proportionally
-        winners_paid = 0
-        total_distributed = 0
-        
+        # Distribute winnings proportionally in exact integer arithmetic
+        payouts = {}
+        remainders = []
         for player_id_str, bet_amount in winning_bets:
             player_id = uuid.UUID(player_id_str)
-            
-            # Calculate winnings (proportional share of total pool)
-            if winning_pool > 0:
-                share = bet_amount / winning_pool
-                payout = int(total_pool * share)
-            else:
-                payout = bet_amount  # Refund if no winners
-            
-            # Add winnings to player
-            success, old_bal, new_bal = await add_player_currency(pool, player_id, payout)
-            if success:
-                winners_paid += 1
-                total_distributed += payout
-                
-                # Log transaction
-                await self.log_transaction(
-                    ctx.guild.id, "market_win", payout,
-                    to_player_id=player_id,
-                    balance_before=old_bal,
-                    balance_after=new_bal,
-                    notes=f"Won from market {market_id[:16]}..."
-                )
+            payouts[player_id], remainder = divmod(total_pool * bet_amount, winning_pool)
+            remainders.append((remainder, player_id))
+        
+        # Coins lost to rounding down go one each to the largest remainders, so the whole pool is paid out
+        leftover = total_pool - sum(payouts.values()) if payouts else 0
+        for _, player_id in sorted(remainders, reverse=True)[:leftover]:
+            payouts[player_id] += 1
+        
+        # Credit every winner in a single UPDATE; if it fails nobody was paid, so leave the market open for a retry
+        try:
+            credited = await add_player_currencies(pool, payouts)
+        except Exception as e:
+            log.error(f"Error paying out market {market_id}: {e}", exc_info=True)
+            await ctx.send("❌ Failed to pay out winnings. The market is still open, so you can try resolving it again.", ephemeral=True)
+            return
+        winners_paid = len(credited)
+        total_distributed = sum(payouts[player_id] for player_id in credited)
+        log_rows = [
+            transaction_row(
+                ctx.guild.id, "market_win", payouts[player_id],
+                to_player_id=player_id,
+                balance_before=old_bal,
+                balance_after=new_bal,
+                notes=f"Won from market {market_id[:16]}..."
+            )
+            for player_id, (old_bal, new_bal) in credited.items()
+        ]
+        
+        # All payout log rows go in with one executemany and one commit
+        if log_rows:
+            await self.write_transaction_rows(log_rows)
         
         # Mark market as resolved
         await self.local_db.execute("""
@@ -2487,9 +3059,6 @@ class SS14Currency(commands.Cog):
             await ctx.send("❌ Database connection not configured.", ephemeral=True)
             return
         
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
         # Verify market exists
         async with self.local_db.execute("""
             SELECT question, status FROM prediction_markets
@@ -2518,25 +3087,30 @@ class SS14Currency(commands.Cog):
         """, (market_id,)) as cursor:
             refunds = await cursor.fetchall()
         
-        # Refund all bets
-        refunded_count = 0
-        total_refunded = 0
+        # Refund all bets in a single UPDATE
+        refund_amounts = {uuid.UUID(player_id_str): amount for player_id_str, amount in refunds}
+        try:
+            credited = await add_player_currencies(pool, refund_amounts)
+        except Exception as e:
+            # Nobody was refunded, so leave the market as it is for a retry
+            log.error(f"Error refunding market {market_id}: {e}", exc_info=True)
+            await ctx.send("❌ Failed to refund bets. The market has not been cancelled, so you can try again.", ephemeral=True)
+            return
+        refunded_count = len(credited)
+        total_refunded = sum(refund_amounts[player_id] for player_id in credited)
+        log_rows = [
+            transaction_row(
+                ctx.guild.id, "market_refund", refund_amounts[player_id],
+                to_player_id=player_id,
+                balance_before=old_bal,
+                balance_after=new_bal,
+                notes=f"Refund from cancelled market {market_id[:16]}..."
+            )
+            for player_id, (old_bal, new_bal) in credited.items()
+        ]
         
-        for player_id_str, amount in refunds:
-            player_id = uuid.UUID(player_id_str)
-            success, old_bal, new_bal = await add_player_currency(pool, player_id, amount)
-            if success:
-                refunded_count += 1
-                total_refunded += amount
-                
-                # Log transaction
-                await self.log_transaction(
-                    ctx.guild.id, "market_refund", amount,
-                    to_player_id=player_id,
-                    balance_before=old_bal,
-                    balance_after=new_bal,
-                    notes=f"Refund from cancelled market {market_id[:16]}..."
-                )
+        if log_rows:
+            await self.write_transaction_rows(log_rows)
         
         # Mark market as cancelled
         await self.local_db.execute("""
@@ -2566,7 +3140,7 @@ class SS14Currency(commands.Cog):
             return
 
         target = user or ctx.author
-        player_id = await get_player_id_from_discord(pool, target.id)
+        player_id = await self.get_player_id(pool, target.id)
         if not player_id:
             await ctx.send(f"{target.mention} doesn't have a linked account.", ephemeral=True)
             return
@@ -2582,15 +3156,12 @@ class SS14Currency(commands.Cog):
         )
         
         for stat in stats:
-            win_rate = (stat['total_wins'] / stat['total_games'] * 100) if stat['total_games'] > 0 else 0
-            net_profit = stat['total_won'] - stat['total_lost']
-            
             value = (
                 f"**Games:** {stat['total_games']} | "
                 f"**W/L:** {stat['total_wins']}/{stat['total_losses']}\n"
-                f"**Win Rate:** {win_rate:.1f}%\n"
+                f"**Win Rate:** {stat['win_rate']:.1f}%\n"
                 f"**Wagered:** {stat['total_wagered']} | "
-                f"**Net:** {net_profit:+d}\n"
+                f"**Net:** {stat['net_profit']:+d}\n"
                 f"**Biggest Win:** {stat['biggest_win']} | "
                 f"**Biggest Loss:** {stat['biggest_loss']}"
             )
@@ -2606,21 +3177,26 @@ class SS14Currency(commands.Cog):
         After creating the market, you'll be prompted to add options.
         Example: /currency createmarket Will the server reach 100 players today?
         """
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
-        # Generate unique market ID (short 8-character hex)
-        market_id = f"{secrets.token_hex(6)}"
-        
-        # Create the market
-        try:
-            await self.local_db.execute("""
-                INSERT INTO prediction_markets (guild_id, market_id, question, created_by_id, status)
-                VALUES (?, ?, ?, ?, 'setup')
-            """, (ctx.guild.id, market_id, question, ctx.author.id))
-            await self.local_db.commit()
-        except Exception as e:
-            log.error(f"Error creating market: {e}", exc_info=True)
+        # Create the market under a short 8-character hex ID. It is an identifier, not a secret,
+        # so the plain PRNG is enough; the UNIQUE constraint catches the rare collision and we draw again.
+        for _ in range(self.MARKET_ID_ATTEMPTS):
+            market_id = f"{random.getrandbits(32):08x}"
+            try:
+                await self.local_db.execute("""
+                    INSERT INTO prediction_markets (guild_id, market_id, question, created_by_id, status)
+                    VALUES (?, ?, ?, ?, 'setup')
+                """, (ctx.guild.id, market_id, question, ctx.author.id))
+                await self.local_db.commit()
+                break
+            except Exception as e:
+                # Only a market_id clash is worth another draw; any other constraint failure is a real error
+                if isinstance(e, aiosqlite.IntegrityError) and "prediction_markets.market_id" in str(e):
+                    continue
+                log.error(f"Error creating market: {e}", exc_info=True)
+                await ctx.send("❌ Failed to create market.", ephemeral=True)
+                return
+        else:
+            log.error(f"Error creating market: no free market ID after {self.MARKET_ID_ATTEMPTS} attempts")
             await ctx.send("❌ Failed to create market.", ephemeral=True)
             return
         
@@ -2655,28 +3231,15 @@ class SS14Currency(commands.Cog):
             await ctx.send("❌ Database connection not configured.", ephemeral=True)
             return
         
-        if self.local_db is None:
-            await self.initialize_local_db()
-        
-        # Get player ID
-        player_id = await get_player_id_from_discord(pool, ctx.author.id)
+        # The player lookup hits the game DB and the market lookup the local one, so run them together
+        player_id, market = await asyncio.gather(
+            self.get_player_id(pool, ctx.author.id),
+            self.get_bet_target(ctx.guild.id, market_id, option)
+        )
         if not player_id:
             await ctx.send("❌ Your Discord account is not linked to an SS14 account.", ephemeral=True)
             return
         
-        # Check balance
-        balance = await get_player_currency(pool, player_id)
-        if balance < amount:
-            await ctx.send(f"❌ Insufficient funds. You have {balance:,} coins but need {amount:,}.", ephemeral=True)
-            return
-        
-        # Verify market exists and is open
-        async with self.local_db.execute("""
-            SELECT question, status FROM prediction_markets
-            WHERE market_id = ? AND guild_id = ?
-        """, (market_id, ctx.guild.id)) as cursor:
-            market = await cursor.fetchone()
-        
         if not market:
             await ctx.send("❌ Market not found.", ephemeral=True)
             return
@@ -2685,17 +3248,16 @@ class SS14Currency(commands.Cog):
             await ctx.send(f"❌ This market is {market[1]} and not accepting bets.", ephemeral=True)
             return
         
-        # Verify option exists
-        async with self.local_db.execute("""
-            SELECT option_text FROM market_options
-            WHERE market_id = ? AND option_index = ?
-        """, (market_id, option)) as cursor:
-            option_data = await cursor.fetchone()
-        
-        if not option_data:
+        if market[2] is None:
             await ctx.send(f"❌ Invalid option number {option}.", ephemeral=True)
             return
         
+        # Check balance
+        balance = await get_player_currency(pool, player_id)
+        if balance < amount:
+            await ctx.send(f"❌ Insufficient funds. You have {balance:,} coins but need {amount:,}.", ephemeral=True)
+            return
+        
         # Deduct coins from player (atomically)
         success, old_balance, new_balance = await add_player_currency(pool, player_id, -amount)
         if not success:
@@ -2724,7 +3286,7 @@ class SS14Currency(commands.Cog):
                 description=f"**Question:** {discord.utils.escape_markdown(market[0])}",
                 color=discord.Color.green()
             )
-            embed.add_field(name="Your Bet", value=f"Option {option}: {discord.utils.escape_markdown(option_data[0])}", inline=False)
+            embed.add_field(name="Your Bet", value=f"Option {option}: {discord.utils.escape_markdown(market[2])}", inline=False)
             embed.add_field(name="Amount Wagered", value=f"{amount:,} coins", inline=True)
             embed.add_field(name="New Balance", value=f"{new_balance:,} coins", inline=True)
             embed.set_footer(text=f"Market ID: {market_id}")
@@ -2734,8 +3296,13 @@ class SS14Currency(commands.Cog):
         except Exception as e:
             # Refund if bet recording fails
             log.error(f"Error recording bet: {e}", exc_info=True)
-            await add_player_currency(pool, player_id, amount)
-            await ctx.send("❌ Failed to record bet. Your coins have been refunded.", ephemeral=True)
+            # Refund before replying so the message says what actually happened
+            refunded, _, _ = await add_player_currency(pool, player_id, amount)
+            if refunded:
+                await ctx.send("❌ Failed to record bet. Your coins have been refunded.", ephemeral=True)
+            else:
+                log.error(f"Failed to refund {amount} coins to {player_id} after a failed bet on market {market_id}")
+                await ctx.send("❌ Failed to record bet, and the refund failed too. Please contact an admin.", ephemeral=True)
 
     @app_commands.command(name="coinsetdb")
     @app_commands.guild_only()
@@ -2749,35 +3316,43 @@ class SS14Currency(commands.Cog):
         await interaction.response.send_modal(DbConfigModal(self, interaction.guild_id))
 
     async def cog_unload(self):
-        await self.session.close()
-        
-        # Close SS14 database pools
-        guild_ids = list(self.guild_pools.keys())
-        for guild_id in guild_ids:
-            pool = self.guild_pools.pop(guild_id)
-            if pool:
-                await pool.close()
-        
-        # Close local SQLite database
-        if self.local_db:
-            await self.local_db.close()
+        # Close the auth API session and the SS14 database pools together
+        pools = [entry.pool for entry in self.pool_entries.values() if entry.pool]
+        self.guild_pools.clear()
+        self.guild_dsn.clear()
+        self.pool_entries.clear()
+        closes = [pool.close() for pool in pools]
+        if self.session is not None:
+            closes.append(self.session.close())
+        await asyncio.gather(*closes, return_exceptions=True)
+        
+        # Stop the log worker once it has flushed anything still queued
+        if self.log_task:
+            self.log_queue.put_nowait(None)
+            await self.log_task
+        
+        # Close local SQLite connections; nothing writes once the log worker has stopped
+        connections = self.local_readers + ([self.local_db] if self.local_db else [])
+        self.local_readers = []
+        await asyncio.gather(*(conn.close() for conn in connections), return_exceptions=True)
         
         log.info("All database connections closed.")
 
     async def get_user_id_from_name(self, username: str) -> Optional[uuid.UUID]:
-        """Queries the SS14 auth API for a user's UUID by their username."""
-        url = f"https://auth.spacestation14.com/api/query/name?name={username}"
+        """Queries the SS14 auth API for a user's UUID by their username. Failed lookups are not cached."""
+        player_id = self.user_id_cache.get(username)
+        if player_id is not None:
+            return player_id
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return uuid.UUID(data["userId"])
-                else:
-                    log.warning(f"API query for {username} failed with status {response.status}")
-                    return None
-        except aiohttp.ClientError as e:
+            data = await query_auth_api(self.session, "name", {"name": username})
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             log.error(f"Error querying auth API for {username}: {e}", exc_info=True)
             return None
+        if not data:
+            return None
+        player_id = uuid.UUID(data["userId"])
+        self.user_id_cache.set(username, player_id)
+        return player_id
 
     @currency.command(name="coinflip")
     @commands.cooldown(rate=1, per=10.0, type=commands.BucketType.user)
@@ -2803,7 +3378,7 @@ class SS14Currency(commands.Cog):
             await ctx.send("Database connection is not configured for this server.", ephemeral=True)
             return
 
-        challenger_id = await get_player_id_from_discord(pool, ctx.author.id)
+        challenger_id = await self.get_player_id(pool, ctx.author.id)
         if not challenger_id:
             await ctx.send("You must have a linked SS14 account to start a coinflip.", ephemeral=True)
             return
@@ -2814,10 +3389,13 @@ class SS14Currency(commands.Cog):
             return
 
         if opponent:
-            opponent_id = await get_player_id_from_discord(pool, opponent.id)
+            opponent_id = await self.get_player_id(pool, opponent.id)
             if not opponent_id:
                 await ctx.send(f"{opponent.mention} does not have a linked SS14 account and cannot be challenged.", ephemeral=True)
                 return
+            if opponent_id == challenger_id:
+                await ctx.send(f"{opponent.mention} is linked to the same SS14 account as you and cannot be challenged.", ephemeral=True)
+                return
 
             opponent_balance = await get_player_currency(pool, opponent_id)
             if opponent_balance < amount:
@@ -2879,7 +3457,7 @@ class SS14Currency(commands.Cog):
             return
         
         # Get player
-        player_id = await get_player_id_from_discord(pool, ctx.author.id)
+        player_id = await self.get_player_id(pool, ctx.author.id)
         if not player_id:
             await ctx.send("❌ Your Discord account is not linked to an SS14 account.", ephemeral=True)
             return
@@ -2897,7 +3475,7 @@ class SS14Currency(commands.Cog):
             return
         
         # Create game
-        player_name = await get_user_name_from_id(self.session, player_id)
+        player_name = await self.get_user_name(player_id)
         game = BlackjackGame(player_id, player_name, wager)
         
         # Check for instant blackjack
@@ -2975,6 +3553,8 @@ class MarketOptionsView(View):
         self.guild_id = guild_id
         self.creator_id = creator_id
         self.options = []
+        # Numbered, markdown-escaped option lines for the embeds, built once per option as it is added
+        self.option_lines = []
         self.message = None
     
     async def update_embed(self):
@@ -2985,9 +3565,8 @@ class MarketOptionsView(View):
             color=discord.Color.blue()
         )
         
-        if self.options:
-            options_text = "\n".join([f"{i+1}. {discord.utils.escape_markdown(opt)}" for i, opt in enumerate(self.options)])
-            embed.add_field(name="Options Added", value=options_text, inline=False)
+        if self.option_lines:
+            embed.add_field(name="Options Added", value="\n".join(self.option_lines), inline=False)
         else:
             embed.add_field(name="Options Added", value="None yet", inline=False)
         
@@ -3009,6 +3588,7 @@ class MarketOptionsView(View):
         
         if modal.submitted_text:
             self.options.append(modal.submitted_text)
+            self.option_lines.append(f"{len(self.options)}. {discord.utils.escape_markdown(modal.submitted_text)}")
             await self.update_embed()
     
     @discord.ui.button(label="Finish", style=discord.ButtonStyle.primary)
@@ -3025,12 +3605,11 @@ class MarketOptionsView(View):
         await interaction.response.defer()
         
         try:
-            # Add options to database
-            for i, option_text in enumerate(self.options):
-                await self.cog.local_db.execute("""
-                    INSERT INTO market_options (market_id, option_index, option_text)
-                    VALUES (?, ?, ?)
-                """, (self.market_id, i + 1, option_text))
+            # Add options to database; they and the status change below commit together
+            await self.cog.local_db.executemany("""
+                INSERT INTO market_options (market_id, option_index, option_text)
+                VALUES (?, ?, ?)
+            """, [(self.market_id, i, option_text) for i, option_text in enumerate(self.options, 1)])
             
             # Update market status to open
             await self.cog.local_db.execute("""
@@ -3051,8 +3630,7 @@ class MarketOptionsView(View):
                 color=discord.Color.green()
             )
             
-            options_text = "\n".join([f"{i+1}. {discord.utils.escape_markdown(opt)}" for i, opt in enumerate(self.options)])
-            embed.add_field(name="Options", value=options_text, inline=False)
+            embed.add_field(name="Options", value="\n".join(self.option_lines), inline=False)
             embed.add_field(name="Market ID", value=f"`{self.market_id}`", inline=False)
             embed.add_field(name="Status", value="🟢 Open for betting", inline=False)
             
@@ -3106,6 +3684,95 @@ class AddOptionModal(Modal, title="Add Market Option"):
         await interaction.response.defer()
 
 
+def build_coinflip_embed(
+    winner: discord.Member,
+    loser: discord.Member,
+    winner_name: str,
+    loser_name: str,
+    transfer_details: Dict[str, int],
+    amount: int,
+    tax_amount: int
+) -> discord.Embed:
+    """Builds the coinflip result embed. Each name is escaped once and reused."""
+    winner_display = discord.utils.escape_markdown(winner.display_name)
+    loser_display = discord.utils.escape_markdown(loser.display_name)
+    winner_name = discord.utils.escape_markdown(winner_name)
+    loser_name = discord.utils.escape_markdown(loser_name)
+    
+    embed = discord.Embed(
+        title="🪙 Coinflip Result!",
+        description=f"**{winner_display}** won the coinflip against **{loser_display}**!",
+        color=discord.Color.gold()
+    )
+    embed.add_field(
+        name=f"🏆 Winner: {winner_display} ({winner_name})",
+        value=balance_change(transfer_details['recipient_old'], transfer_details['recipient_new']),
+        inline=False
+    )
+    embed.add_field(
+        name=f"💸 Loser: {loser_display} ({loser_name})",
+        value=balance_change(transfer_details['sender_old'], transfer_details['sender_new']),
+        inline=False
+    )
+    embed.add_field(name="💰 Total Wager", value=f"{amount:,} coins", inline=True)
+    embed.add_field(name="🏦 Tax (5%)", value=f"{tax_amount:,} coins", inline=True)
+    embed.add_field(name="✨ Winner Receives", value=f"{amount - tax_amount:,} coins", inline=True)
+    return embed
+
+
+async def resolve_coinflip(
+    view: View,
+    cog: 'SS14Currency',
+    pool: asyncpg.Pool,
+    guild_id: int,
+    challenger: discord.Member,
+    opponent: discord.Member,
+    challenger_id: uuid.UUID,
+    opponent_id: uuid.UUID,
+    amount: int
+) -> None:
+    """Flips the coin for an accepted challenge, moves the coins, records the result and updates the view's message."""
+    if _coinflip_rng.getrandbits(1):
+        winner, loser, winner_player_id, loser_player_id = challenger, opponent, challenger_id, opponent_id
+    else:
+        winner, loser, winner_player_id, loser_player_id = opponent, challenger, opponent_id, challenger_id
+
+    tax_amount = int(amount * 0.05)
+    winner_receives = amount - tax_amount
+
+    # Debit and credit happen in one statement, so a failure can never leave
+    # the loser charged without the winner being paid
+    transfer_details = await transfer_currency(pool, loser_player_id, winner_player_id, amount, winner_receives)
+    if not transfer_details:
+        log.warning("Coinflip transfer failed: loser could not cover the wager or an account is missing.")
+
+    for item in view.children:
+        item.disabled = True
+    
+    if transfer_details:
+        winner_name, loser_name = await asyncio.gather(
+            cog.get_user_name(winner_player_id),
+            cog.get_user_name(loser_player_id)
+        )
+        winner_name = winner_name or str(winner_player_id)[:8]
+        loser_name = loser_name or str(loser_player_id)[:8]
+        
+        # Record tax and gambling statistics, and log both sides, in one write that
+        # overlaps the message edit; log_gambling_outcome logs its own failures
+        outcome_task = asyncio.create_task(cog.log_gambling_outcome(
+            guild_id, "coinflip", amount,
+            winner_player_id, loser_player_id, winner_receives,
+            transfer_details, winner_name, loser_name, tax_amount
+        ))
+
+        embed = build_coinflip_embed(winner, loser, winner_name, loser_name, transfer_details, amount, tax_amount)
+        await asyncio.gather(view.message.edit(content=None, embed=embed, view=view), outcome_task)
+    else:
+        await view.message.edit(content="An error occurred during the transfer.", view=view)
+    
+    view.stop()
+
+
 class OpenCoinflipView(View):
     def __init__(self, cog: 'SS14Currency', challenger: discord.Member, amount: int, pool: asyncpg.Pool, guild_id: int):
         super().__init__(timeout=300) # 5 minute timeout for open challenges
@@ -3135,15 +3802,27 @@ class OpenCoinflipView(View):
 
         await interaction.response.defer()
 
-        challenger_id = await get_player_id_from_discord(self.pool, self.challenger.id)
-        opponent_id = await get_player_id_from_discord(self.pool, opponent.id)
+        challenger_id, opponent_id = await asyncio.gather(
+            self.cog.get_player_id(self.pool, self.challenger.id),
+            self.cog.get_player_id(self.pool, opponent.id)
+        )
 
         if not opponent_id:
             await interaction.followup.send("You must have a linked SS14 account to accept a coinflip challenge.", ephemeral=True)
             return
+        if not challenger_id:
+            await interaction.followup.send(f"{self.challenger.mention} no longer has a linked SS14 account.", ephemeral=True)
+            self.stop()
+            return
+        if opponent_id == challenger_id:
+            # Linked to the same SS14 account; leave the challenge open for someone else
+            await interaction.followup.send("You cannot accept a coinflip against your own SS14 account.", ephemeral=True)
+            return
 
-        challenger_balance = await get_player_currency(self.pool, challenger_id)
-        opponent_balance = await get_player_currency(self.pool, opponent_id)
+        challenger_balance, opponent_balance = await asyncio.gather(
+            get_player_currency(self.pool, challenger_id),
+            get_player_currency(self.pool, opponent_id)
+        )
 
         if challenger_balance < self.amount:
             await interaction.followup.send(f"{self.challenger.mention} no longer has enough coins for this coinflip.", ephemeral=True)
@@ -3154,100 +3833,7 @@ class OpenCoinflipView(View):
             self.stop()
             return
 
-        winner = random.choice([self.challenger, opponent])
-        loser = opponent if winner.id == self.challenger.id else self.challenger
-        
-        winner_player_id = challenger_id if winner.id == self.challenger.id else opponent_id
-        loser_player_id = opponent_id if winner.id == self.challenger.id else challenger_id
-
-        tax_amount = int(self.amount * 0.05)
-        winner_receives = self.amount - tax_amount
-
-        loser_details = None
-        winner_details = None
-        transfer_details = None
-        
-        try:
-            loser_details = await add_player_currency(self.pool, loser_player_id, -self.amount)
-            
-            if loser_details[0]:
-                winner_details = await add_player_currency(self.pool, winner_player_id, winner_receives)
-                if winner_details[0]: 
-                    transfer_details = {
-                        'sender_old': loser_details[1],
-                        'sender_new': loser_details[2],
-                        'recipient_old': winner_details[1],
-                        'recipient_new': winner_details[2],
-                    }
-                else:
-                    print("Coinflip transfer failed: Winner transaction failed. Refunding loser.")
-                    await add_player_currency(self.pool, loser_player_id, self.amount)
-            
-            else:
-                print("Coinflip transfer failed: Loser transaction failed (likely insufficient funds).")
-
-        except Exception as e:
-            print(f"Coinflip transfer error: {e}")
-            transfer_details = None
-
-        for item in self.children:
-            item.disabled = True
-        
-        if transfer_details:
-            winner_name = await get_user_name_from_id(self.cog.session, winner_player_id)
-            loser_name = await get_user_name_from_id(self.cog.session, loser_player_id)
-            
-            # Record tax
-            await self.cog.record_tax(self.guild_id, "coinflip", tax_amount)
-            
-            # Record gambling statistics (net for winner is reduced by tax)
-            await self.cog.record_gambling_result(
-                self.guild_id, winner_player_id, "coinflip",
-                self.amount, True, winner_receives
-            )
-            await self.cog.record_gambling_result(
-                self.guild_id, loser_player_id, "coinflip",
-                self.amount, False, -self.amount
-            )
-            
-            # Log gambling transactions
-            await self.cog.log_transaction(
-                self.guild_id, "gambling", winner_receives,
-                from_player_id=loser_player_id,
-                to_player_id=winner_player_id,
-                balance_before=transfer_details['recipient_old'],
-                balance_after=transfer_details['recipient_new'],
-                notes=f"Coinflip win vs {loser_name} (after {tax_amount} tax)"
-            )
-            await self.cog.log_transaction(
-                self.guild_id, "gambling", -self.amount,
-                from_player_id=loser_player_id,
-                to_player_id=winner_player_id,
-                balance_before=transfer_details['sender_old'],
-                balance_after=transfer_details['sender_new'],
-                notes=f"Coinflip loss vs {winner_name}"
-            )
-
-            embed = discord.Embed(title="🪙 Coinflip Result!", color=discord.Color.gold())
-            embed.description = f"**{discord.utils.escape_markdown(winner.display_name)}** won the coinflip against **{discord.utils.escape_markdown(loser.display_name)}**!"
-            
-            winner_field_name = f"🏆 Winner: {discord.utils.escape_markdown(winner.display_name)} ({discord.utils.escape_markdown(winner_name)})"
-            winner_field_value = f"`{transfer_details['recipient_old']:,}` ➜ `{transfer_details['recipient_new']:,}`"
-            embed.add_field(name=winner_field_name, value=winner_field_value, inline=False)
-            
-            loser_field_name = f"💸 Loser: {discord.utils.escape_markdown(loser.display_name)} ({discord.utils.escape_markdown(loser_name)})"
-            loser_field_value = f"`{transfer_details['sender_old']:,}` ➜ `{transfer_details['sender_new']:,}`"
-            embed.add_field(name=loser_field_name, value=loser_field_value, inline=False)
-
-            embed.add_field(name="💰 Total Wager", value=f"{self.amount:,} coins", inline=True)
-            embed.add_field(name="🏦 Tax (5%)", value=f"{tax_amount:,} coins", inline=True)
-            embed.add_field(name="✨ Winner Receives", value=f"{winner_receives:,} coins", inline=True)
-            
-            await self.message.edit(content=None, embed=embed, view=self)
-        else:
-            await self.message.edit(content="An error occurred during the transfer.", view=self)
-        
-        self.stop()
+        await resolve_coinflip(self, self.cog, self.pool, self.guild_id, self.challenger, opponent, challenger_id, opponent_id, self.amount)
 
 class CoinflipView(View):
     def __init__(self, cog: 'SS14Currency', challenger: discord.Member, opponent: discord.Member, amount: int, pool: asyncpg.Pool, guild_id: int):
@@ -3279,11 +3865,24 @@ class CoinflipView(View):
 
         await interaction.response.defer()
 
-        challenger_id = await get_player_id_from_discord(self.pool, self.challenger.id)
-        opponent_id = await get_player_id_from_discord(self.pool, self.opponent.id)
+        challenger_id, opponent_id = await asyncio.gather(
+            self.cog.get_player_id(self.pool, self.challenger.id),
+            self.cog.get_player_id(self.pool, self.opponent.id)
+        )
 
-        challenger_balance = await get_player_currency(self.pool, challenger_id)
-        opponent_balance = await get_player_currency(self.pool, opponent_id)
+        if not challenger_id or not opponent_id:
+            await interaction.followup.send("Both players must have a linked SS14 account for this coinflip.", ephemeral=True)
+            self.stop()
+            return
+        if opponent_id == challenger_id:
+            await interaction.followup.send("Both players are linked to the same SS14 account, so this coinflip cannot be played.", ephemeral=True)
+            self.stop()
+            return
+
+        challenger_balance, opponent_balance = await asyncio.gather(
+            get_player_currency(self.pool, challenger_id),
+            get_player_currency(self.pool, opponent_id)
+        )
 
         if challenger_balance < self.amount:
             await interaction.followup.send(f"{self.challenger.mention} no longer has enough coins for this coinflip.", ephemeral=True)
@@ -3294,100 +3893,7 @@ class CoinflipView(View):
             self.stop()
             return
 
-        winner = random.choice([self.challenger, self.opponent])
-        loser = self.opponent if winner.id == self.challenger.id else self.challenger
-        
-        winner_player_id = challenger_id if winner.id == self.challenger.id else opponent_id
-        loser_player_id = opponent_id if winner.id == self.challenger.id else challenger_id
-
-        tax_amount = int(self.amount * 0.05)
-        winner_receives = self.amount - tax_amount
-
-        loser_details = None
-        winner_details = None
-        transfer_details = None
-        
-        try:
-            loser_details = await add_player_currency(self.pool, loser_player_id, -self.amount)
-            
-            if loser_details[0]:
-                winner_details = await add_player_currency(self.pool, winner_player_id, winner_receives)
-                if winner_details[0]: 
-                    transfer_details = {
-                        'sender_old': loser_details[1],
-                        'sender_new': loser_details[2],
-                        'recipient_old': winner_details[1],
-                        'recipient_new': winner_details[2],
-                    }
-                else:
-                    print("Coinflip transfer failed: Winner transaction failed. Refunding loser.")
-                    await add_player_currency(self.pool, loser_player_id, self.amount)
-            
-            else:
-                print("Coinflip transfer failed: Loser transaction failed (likely insufficient funds).")
-
-        except Exception as e:
-            print(f"Coinflip transfer error: {e}")
-            transfer_details = None
-
-        for item in self.children:
-            item.disabled = True
-        
-        if transfer_details:
-            winner_name = await get_user_name_from_id(self.cog.session, winner_player_id)
-            loser_name = await get_user_name_from_id(self.cog.session, loser_player_id)
-            
-            # Record tax
-            await self.cog.record_tax(self.guild_id, "coinflip", tax_amount)
-            
-            # Record gambling statistics (net for winner is reduced by tax)
-            await self.cog.record_gambling_result(
-                self.guild_id, winner_player_id, "coinflip",
-                self.amount, True, winner_receives
-            )
-            await self.cog.record_gambling_result(
-                self.guild_id, loser_player_id, "coinflip",
-                self.amount, False, -self.amount
-            )
-            
-            # Log gambling transactions
-            await self.cog.log_transaction(
-                self.guild_id, "gambling", winner_receives,
-                from_player_id=loser_player_id,
-                to_player_id=winner_player_id,
-                balance_before=transfer_details['recipient_old'],
-                balance_after=transfer_details['recipient_new'],
-                notes=f"Coinflip win vs {loser_name} (after {tax_amount} tax)"
-            )
-            await self.cog.log_transaction(
-                self.guild_id, "gambling", -self.amount,
-                from_player_id=loser_player_id,
-                to_player_id=winner_player_id,
-                balance_before=transfer_details['sender_old'],
-                balance_after=transfer_details['sender_new'],
-                notes=f"Coinflip loss vs {winner_name}"
-            )
-
-            embed = discord.Embed(title="🪙 Coinflip Result!", color=discord.Color.gold())
-            embed.description = f"**{discord.utils.escape_markdown(winner.display_name)}** won the coinflip against **{discord.utils.escape_markdown(loser.display_name)}**!"
-            
-            winner_field_name = f"🏆 Winner: {discord.utils.escape_markdown(winner.display_name)} ({discord.utils.escape_markdown(winner_name)})"
-            winner_field_value = f"`{transfer_details['recipient_old']:,}` ➜ `{transfer_details['recipient_new']:,}`"
-            embed.add_field(name=winner_field_name, value=winner_field_value, inline=False)
-            
-            loser_field_name = f"💸 Loser: {discord.utils.escape_markdown(loser.display_name)} ({discord.utils.escape_markdown(loser_name)})"
-            loser_field_value = f"`{transfer_details['sender_old']:,}` ➜ `{transfer_details['sender_new']:,}`"
-            embed.add_field(name=loser_field_name, value=loser_field_value, inline=False)
-
-            embed.add_field(name="💰 Total Wager", value=f"{self.amount:,} coins", inline=True)
-            embed.add_field(name="🏦 Tax (5%)", value=f"{tax_amount:,} coins", inline=True)
-            embed.add_field(name="✨ Winner Receives", value=f"{winner_receives:,} coins", inline=True)
-            
-            await self.message.edit(content=None, embed=embed, view=self)
-        else:
-            await self.message.edit(content="An error occurred during the transfer.", view=self)
-        
-        self.stop()
+        await resolve_coinflip(self, self.cog, self.pool, self.guild_id, self.challenger, self.opponent, challenger_id, opponent_id, self.amount)
 
 
     @discord.ui.button(label="Decline", style=discord.ButtonStyle.red)